@@ -1,26 +1,91 @@
+import io
 import os
+import csv
+import copy
 import json
+import sqlite3
 import time
+import heapq
+import random
 import hashlib
-from datetime import datetime
+import hmac
+import re
+import gzip
+import shutil
+import socket
+import bisect
+import atexit
+import asyncio
+import functools
+import threading
+import contextvars
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+from urllib.parse import parse_qs, quote, unquote, urljoin, urlparse
 from zoneinfo import ZoneInfo
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import requests
-import yaml
-import feedparser
+import requests.adapters
+import requests.structures
+import requests.utils
 from dotenv import load_dotenv
 import xml.etree.ElementTree as ET
 
 JST = ZoneInfo("Asia/Tokyo")
 
+EGOV_UPDATES_URL = "https://laws.e-gov.go.jp/api/1/updatelawlists/{date}"
+JGRANTS_SUBSIDIES_URL = "https://api.jgrants-portal.go.jp/exp/v1/public/subsidies"
+# Past days' update lists never change once settled, so they are kept here for good
+EGOV_ARCHIVE_DIR = os.path.join(".cache", "egov")
+# ...but a list can still be published or amended late: only days at least this old are archived
+EGOV_ARCHIVE_AFTER_DAYS = 2
+
+# State keys that fetchers update in place (written back even when nothing is new)
+FETCH_STATE_KEYS = ("validators", "body_sha1", "egov_last_date", "websub_hub")
+
+# Per-target deadline (time.monotonic() value), set while a target is being processed
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("deadline", default=None)
+# Per-target warnings (partial failures etc.) collected for the run summary
+_notes: contextvars.ContextVar[Optional[List[str]]] = contextvars.ContextVar("notes", default=None)
+# Set while a half-open circuit breaker sends its single probe: no retries
+_probe: contextvars.ContextVar[bool] = contextvars.ContextVar("probe", default=False)
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class NotModified(Exception):
+    """Raised by a conditional fetch when the server answered 304."""
+
+
+class BodyUnchanged(NotModified):
+    """Raised when a body is byte-identical to the last one processed for the target."""
+
+
+class BodyTooLarge(Exception):
+    pass
+
 
 def now_jst_str() -> str:
     return datetime.now(JST).strftime("%Y-%m-%d %H:%M:%S JST")
 
 
+_log_lock = threading.Lock()
+
+
+def log(msg: str) -> None:
+    # Single write per line so concurrent targets don't interleave output
+    with _log_lock:
+        print(msg, flush=True)
+
+
 def yyyymmdd_jst() -> str:
-    return datetime.now(JST).strftime("%Y%m%d")
+    # --replay pins "today" to the recording day: the e-Gov URL (and so the archive key) carries it
+    return HTTP_ARCHIVE.today or datetime.now(JST).strftime("%Y%m%d")
 
 
 def safe_text(s: Any) -> str:
@@ -33,51 +98,989 @@ def sha1(s: str) -> str:
     return hashlib.sha1(s.encode("utf-8")).hexdigest()
 
 
+def item_fingerprint(it: Dict[str, Any]) -> str:
+    # Compact digest of the notified fields; state keeps one per seen id to spot in-place edits
+    return sha1("\x1f".join(safe_text(it.get(k)) for k in ("title", "summary", "published", "url")))[:12]
+
+
 def load_yaml(path: str) -> Dict[str, Any]:
+    import yaml
+
     with open(path, "r", encoding="utf-8") as f:
         return yaml.safe_load(f)
 
 
+_made_dirs: set = set()
+
+
 def ensure_dir(path: str) -> None:
-    os.makedirs(path, exist_ok=True)
+    if path not in _made_dirs:
+        os.makedirs(path, exist_ok=True)
+        _made_dirs.add(path)
+
+
+def state_dir() -> str:
+    return HTTP_ARCHIVE.state_dir if HTTP_ARCHIVE.replaying else ".state"
 
 
 def state_path(target_id: str) -> str:
-    ensure_dir(".state")
-    return os.path.join(".state", f"{target_id}.json")
+    return os.path.join(state_dir(), f"{target_id}.json")
+
+
+# -----------------------
+# State backends
+# -----------------------
+
+class JsonStateBackend:
+    """One pretty-printed JSON file per target under the state dir (the original layout)."""
+
+    def load(self, target_id: str) -> Dict[str, Any]:
+        try:
+            with open(state_path(target_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"seen_ids": []}
+
+    def save(self, target_id: str, state: Dict[str, Any]) -> None:
+        ensure_dir(state_dir())
+        with open(state_path(target_id), "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+
+    def after_commit(self, fn: Callable[[], None]) -> None:
+        fn()  # every save is already on disk
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class SqliteStateBackend:
+    """All target state in one SQLite database (WAL), in indexed tables.
+
+    seen ids (with their fingerprints, in order) and validators get their own tables; the small
+    remaining keys live in targets.extra as JSON. Saves are buffered in memory and written by
+    flush() in a single transaction, once per run. Callbacks registered with after_commit (lease
+    releases) run after that commit, so another process never takes over a target whose new state
+    is not committed yet. On first use the per-target JSON files in the state dir are imported.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS targets (
+            id TEXT PRIMARY KEY,
+            last_run TEXT,
+            body_sha1 TEXT,
+            extra TEXT NOT NULL DEFAULT '{}'
+        );
+        CREATE TABLE IF NOT EXISTS seen_ids (
+            target_id TEXT NOT NULL,
+            pos INTEGER NOT NULL,
+            item_id TEXT NOT NULL,
+            fingerprint TEXT,
+            PRIMARY KEY (target_id, item_id)
+        );
+        CREATE INDEX IF NOT EXISTS seen_ids_order ON seen_ids (target_id, pos);
+        CREATE TABLE IF NOT EXISTS validators (
+            target_id TEXT NOT NULL,
+            url TEXT NOT NULL,
+            etag TEXT,
+            last_modified TEXT,
+            PRIMARY KEY (target_id, url)
+        );
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._callbacks: List[Callable[[], None]] = []
+        ensure_dir(os.path.dirname(path) or ".")
+        fresh = not os.path.exists(path)
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(self.SCHEMA)
+        if fresh and os.path.isdir(state_dir()):
+            self.migrate_json(state_dir())  # where the JSON backend kept them, wherever state.path points
+
+    def migrate_json(self, json_dir: str) -> None:
+        # Import <id>.json files left by the JSON backend (they are kept as they are)
+        names = [n for n in os.listdir(json_dir) if n.endswith(".json") and not n.startswith("_")]
+        for name in names:
+            try:
+                with open(os.path.join(json_dir, name), "r", encoding="utf-8") as f:
+                    self._pending[name[:-5]] = json.load(f)
+            except (OSError, ValueError) as e:
+                log(f"state: skipped {name} during import: {safe_text(e)}")
+        if self._pending:
+            self.flush()
+            log(f"state: imported {len(names)} JSON state file(s) from {json_dir} into {self.path}")
+
+    def load(self, target_id: str) -> Dict[str, Any]:
+        with self._lock:
+            if target_id in self._pending:
+                return copy.deepcopy(self._pending[target_id])
+            row = self._db.execute("SELECT last_run, body_sha1, extra FROM targets WHERE id = ?", (target_id,)).fetchone()
+            if row is None:
+                return {"seen_ids": []}
+            seen = self._db.execute("SELECT item_id, fingerprint FROM seen_ids WHERE target_id = ? ORDER BY pos", (target_id,)).fetchall()
+            validators = self._db.execute("SELECT url, etag, last_modified FROM validators WHERE target_id = ?", (target_id,)).fetchall()
+
+        st: Dict[str, Any] = json.loads(row[2])
+        st["seen_ids"] = [i for i, _ in seen]
+        fingerprints = {i: fp for i, fp in seen if fp}
+        if fingerprints:
+            st["fingerprints"] = fingerprints
+        if validators:
+            st["validators"] = {url: {k: v for k, v in (("etag", etag), ("last_modified", lm)) if v} for url, etag, lm in validators}
+        if row[0]:
+            st["last_run"] = row[0]
+        if row[1]:
+            st["body_sha1"] = row[1]
+        return st
+
+    def save(self, target_id: str, state: Dict[str, Any]) -> None:
+        with self._lock:
+            self._pending[target_id] = copy.deepcopy(state)
+
+    def after_commit(self, fn: Callable[[], None]) -> None:
+        with self._lock:
+            self._callbacks.append(fn)
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            callbacks, self._callbacks = self._callbacks, []
+            try:
+                if pending:
+                    self._write(pending)
+            except Exception:
+                # Keep the batch for the next flush; newer saves win
+                self._pending = {**pending, **self._pending}
+                raise
+            finally:
+                for fn in callbacks:
+                    fn()
+
+    def _write(self, pending: Dict[str, Dict[str, Any]]) -> None:
+        db = self._db
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            for tid, st in pending.items():
+                extra = {k: v for k, v in st.items() if k not in ("seen_ids", "fingerprints", "validators", "last_run", "body_sha1")}
+                db.execute(
+                    "INSERT INTO targets (id, last_run, body_sha1, extra) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(id) DO UPDATE SET last_run = excluded.last_run, body_sha1 = excluded.body_sha1, extra = excluded.extra",
+                    (tid, st.get("last_run"), st.get("body_sha1"), json.dumps(extra, ensure_ascii=False)),
+                )
+                fps = st.get("fingerprints", {})
+                db.execute("DELETE FROM seen_ids WHERE target_id = ?", (tid,))
+                db.executemany(
+                    "INSERT OR IGNORE INTO seen_ids (target_id, pos, item_id, fingerprint) VALUES (?, ?, ?, ?)",
+                    [(tid, pos, i, fps.get(i)) for pos, i in enumerate(st.get("seen_ids", []))],
+                )
+                db.execute("DELETE FROM validators WHERE target_id = ?", (tid,))
+                db.executemany(
+                    "INSERT INTO validators (target_id, url, etag, last_modified) VALUES (?, ?, ?, ?)",
+                    [(tid, url, v.get("etag"), v.get("last_modified")) for url, v in (st.get("validators") or {}).items()],
+                )
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def close(self) -> None:
+        self.flush()
+        self._db.close()
+
+
+class StateStore:
+    """Front for the configured backend (state.backend: json | sqlite)."""
+
+    def __init__(self) -> None:
+        self.backend: Any = JsonStateBackend()
+
+    def configure(self, state_cfg: Dict[str, Any]) -> None:
+        kind = str(state_cfg.get("backend", "json"))
+        if kind == "sqlite":
+            self.backend = SqliteStateBackend(str(state_cfg.get("path") or os.path.join(state_dir(), "state.db")))
+        elif kind == "json":
+            self.backend = JsonStateBackend()
+        else:
+            raise ValueError(f"unknown state backend: {kind}")
+
+    def load(self, target_id: str) -> Dict[str, Any]:
+        return self.backend.load(target_id)
+
+    def save(self, target_id: str, state: Dict[str, Any]) -> None:
+        self.backend.save(target_id, state)
+
+    def after_commit(self, fn: Callable[[], None]) -> None:
+        self.backend.after_commit(fn)
+
+    def flush(self) -> None:
+        self.backend.flush()
+
+    def close(self) -> None:
+        self.backend.close()
+
+
+STATE = StateStore()
 
 
 def load_state(target_id: str) -> Dict[str, Any]:
-    p = state_path(target_id)
-    if not os.path.exists(p):
-        return {"seen_ids": []}
-    with open(p, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return STATE.load(target_id)
 
 
 def save_state(target_id: str, state: Dict[str, Any]) -> None:
-    p = state_path(target_id)
-    with open(p, "w", encoding="utf-8") as f:
-        json.dump(state, f, ensure_ascii=False, indent=2)
+    STATE.save(target_id, state)
 
 
-def http_get(url: str, params: Optional[Dict[str, Any]] = None, timeout: int = 20) -> requests.Response:
+# -----------------------
+# HTTP client
+# -----------------------
+
+class SessionManager:
+    """Process-wide keep-alive sessions: one requests.Session (and connection pool) per host."""
+
+    def __init__(self, pool_maxsize: int = 10, idle_timeout_sec: float = 90.0, max_body_bytes: int = 10 * 1024 * 1024):
+        self.pool_maxsize = pool_maxsize
+        self.idle_timeout_sec = idle_timeout_sec
+        self.max_body_bytes = max_body_bytes
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, requests.Session] = {}
+        self._last_used: Dict[str, float] = {}
+        # counters of sessions already reaped
+        self._opened = 0
+        self._requests = 0
+
+    def configure(self, http_cfg: Dict[str, Any]) -> None:
+        self.pool_maxsize = max(1, int(http_cfg.get("pool_maxsize", self.pool_maxsize)))
+        self.idle_timeout_sec = float(http_cfg.get("idle_timeout_sec", self.idle_timeout_sec))
+        self.max_body_bytes = int(http_cfg.get("max_body_bytes", self.max_body_bytes))
+
+    def session(self, url: str) -> requests.Session:
+        u = urlparse(url)
+        key = f"{u.scheme}://{u.netloc}"
+        now = time.monotonic()
+        with self._lock:
+            self._reap(now)
+            s = self._sessions.get(key)
+            if s is None:
+                s = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize)
+                s.mount("http://", adapter)
+                s.mount("https://", adapter)
+                self._sessions[key] = s
+            self._last_used[key] = now
+            return s
+
+    def reap_idle(self) -> None:
+        with self._lock:
+            self._reap(time.monotonic())
+
+    def close(self) -> None:
+        with self._lock:
+            for key in list(self._sessions):
+                self._drop(key)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            opened, reqs = self._opened, self._requests
+            for s in self._sessions.values():
+                o, r = self._pool_counts(s)
+                opened += o
+                reqs += r
+        return {"requests": reqs, "opened": opened, "reused": max(0, reqs - opened)}
+
+    def _reap(self, now: float) -> None:
+        for key, last in list(self._last_used.items()):
+            if now - last > self.idle_timeout_sec:
+                self._drop(key)
+
+    def _drop(self, key: str) -> None:
+        s = self._sessions.pop(key)
+        self._last_used.pop(key, None)
+        o, r = self._pool_counts(s)
+        self._opened += o
+        self._requests += r
+        s.close()
+
+    @staticmethod
+    def _pool_counts(s: requests.Session) -> Tuple[int, int]:
+        # urllib3 pools count new connections and requests; the difference is keep-alive reuse
+        opened = reqs = 0
+        seen = set()
+        for adapter in s.adapters.values():
+            if id(adapter) in seen:
+                continue
+            seen.add(id(adapter))
+            pools = adapter.poolmanager.pools
+            for k in list(pools.keys()):
+                pool = pools.get(k)
+                if pool is not None:
+                    opened += pool.num_connections
+                    reqs += pool.num_requests
+        return opened, reqs
+
+
+SESSIONS = SessionManager()
+
+
+class HostLimiter:
+    """Token bucket (rate/burst) plus a cap on requests in flight for one host.
+
+    Callers queue until both a slot and a token are available; they never fail,
+    except when the current target's deadline runs out while waiting.
+    """
+
+    def __init__(self, rate: float = 0.0, burst: int = 1, max_in_flight: int = 0):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_in_flight) if max_in_flight > 0 else None
+        self.waited = 0.0
+        self.queued = 0
+
+    def acquire(self) -> float:
+        started = time.monotonic()
+        if self._slots is not None and not self._slots.acquire(timeout=time_left(3600.0)):
+            raise DeadlineExceeded("target deadline exceeded (waiting for a host slot)")
+        try:
+            while self.rate > 0:
+                with self._lock:
+                    now = time.monotonic()
+                    self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+                    self._stamp = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        break
+                    delay = (1 - self._tokens) / self.rate
+                time.sleep(time_left(delay))
+        except BaseException:
+            self.release()
+            raise
+
+        waited = time.monotonic() - started
+        if waited > 0.001:
+            with self._lock:
+                self.waited += waited
+                self.queued += 1
+        return waited
+
+    def release(self) -> None:
+        if self._slots is not None:
+            self._slots.release()
+
+
+class RateLimits:
+    """Per-host HostLimiter registry configured from http.rate_limits."""
+
+    def __init__(self) -> None:
+        self.default: Dict[str, Any] = {}
+        self.hosts: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._limiters: Dict[str, HostLimiter] = {}
+
+    def configure(self, rl_cfg: Dict[str, Any]) -> None:
+        with self._lock:
+            self.default = dict(rl_cfg.get("default") or {})
+            self.hosts = {str(h).lower(): dict(v or {}) for h, v in (rl_cfg.get("hosts") or {}).items()}
+            self._limiters.clear()
+
+    def get(self, url: str) -> HostLimiter:
+        host = (urlparse(url).hostname or "").lower()
+        with self._lock:
+            lim = self._limiters.get(host)
+            if lim is None:
+                c = {**self.default, **self.hosts.get(host, {})}
+                lim = HostLimiter(
+                    rate=float(c.get("rate", 0)),
+                    burst=int(c.get("burst", 1)),
+                    max_in_flight=int(c.get("max_in_flight", 0)),
+                )
+                self._limiters[host] = lim
+            return lim
+
+    def waits(self) -> Dict[str, Tuple[float, int]]:
+        with self._lock:
+            return {h: (lim.waited, lim.queued) for h, lim in self._limiters.items() if lim.queued}
+
+
+RATE_LIMITS = RateLimits()
+
+
+def time_left(timeout: float) -> float:
+    # Clamp a network timeout to whatever is left of the current target's deadline
+    dl = _deadline.get()
+    if dl is None:
+        return timeout
+    left = dl - time.monotonic()
+    if left <= 0:
+        raise DeadlineExceeded("target deadline exceeded")
+    return min(timeout, left)
+
+
+def note(msg: str) -> None:
+    notes = _notes.get()
+    if notes is None:
+        log(f"  ! {msg}")
+    else:
+        notes.append(msg)
+
+
+def check_deadline() -> None:
+    dl = _deadline.get()
+    if dl is not None and time.monotonic() >= dl:
+        raise DeadlineExceeded("target deadline exceeded")
+
+
+class RetryPolicy:
+    """Capped exponential backoff with full jitter for transient HTTP failures."""
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, attempts: int = 3, base_sec: float = 0.5, max_sec: float = 8.0):
+        self.attempts = attempts
+        self.base_sec = base_sec
+        self.max_sec = max_sec
+
+    def configure(self, retry_cfg: Dict[str, Any]) -> None:
+        self.attempts = max(1, int(retry_cfg.get("attempts", self.attempts)))
+        self.base_sec = float(retry_cfg.get("base_sec", self.base_sec))
+        self.max_sec = float(retry_cfg.get("max_sec", self.max_sec))
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after and retry_after.strip().isdigit():
+            return min(self.max_sec, float(retry_after))
+        return random.uniform(0, min(self.max_sec, self.base_sec * (2 ** (attempt - 1))))
+
+
+RETRY = RetryPolicy()
+
+
+def _release_on_close(r: requests.Response, limiter: HostLimiter) -> None:
+    close = r.close
+    released = threading.Event()
+
+    def close_and_release() -> None:
+        try:
+            close()
+        finally:
+            if not released.is_set():
+                released.set()
+                limiter.release()
+
+    r.close = close_and_release  # type: ignore[method-assign]
+
+
+class DiskCache:
+    """HTTP response cache on disk so separate --once processes can share responses.
+
+    Honors Cache-Control (no-store, no-cache, max-age) and Expires for freshness and keeps
+    ETag/Last-Modified for revalidation. Least recently used entries are evicted beyond max_bytes.
+    """
+
+    def __init__(self, path: str = ".cache/http", max_bytes: int = 50 * 1024 * 1024, enabled: bool = False):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._index: Optional[Dict[str, List[float]]] = None  # key -> [size, last access]
+
+    def configure(self, cache_cfg: Dict[str, Any]) -> None:
+        self.enabled = bool(cache_cfg.get("enabled", self.enabled))
+        self.path = str(cache_cfg.get("dir", self.path))
+        self.max_bytes = int(cache_cfg.get("max_bytes", self.max_bytes))
+        self._index = None
+
+    @staticmethod
+    def key(url: str, params: Optional[Dict[str, Any]]) -> str:
+        return sha1(requests.Request("GET", url, params=params).prepare().url or url)
+
+    def _files(self, key: str) -> Tuple[str, str]:
+        return os.path.join(self.path, f"{key}.json"), os.path.join(self.path, f"{key}.body")
+
+    def _load_index(self) -> Dict[str, List[float]]:
+        if self._index is None:
+            ensure_dir(self.path)
+            index: Dict[str, List[float]] = {}
+            for name in os.listdir(self.path):
+                if name.endswith(".body"):
+                    st = os.stat(os.path.join(self.path, name))
+                    index[name[:-5]] = [st.st_size, st.st_mtime]
+            self._index = index
+        return self._index
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        meta_path, _ = self._files(key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            entry = self._load_index().get(key)
+            if entry:
+                entry[1] = time.time()
+        return meta
+
+    def body(self, key: str) -> bytes:
+        with open(self._files(key)[1], "rb") as f:
+            return f.read()
+
+    @staticmethod
+    def freshness(headers: Any) -> Optional[float]:
+        # Absolute expiry time, or None when the response must not be stored
+        cc = {}
+        for part in (headers.get("Cache-Control") or "").lower().split(","):
+            k, _, v = part.strip().partition("=")
+            cc[k] = v.strip('"')
+        if "no-store" in cc:
+            return None
+        now = time.time()
+        if "no-cache" in cc:
+            return now
+        if cc.get("max-age", "").isdigit():
+            age = headers.get("Age") or "0"
+            return now + int(cc["max-age"]) - (int(age) if age.isdigit() else 0)
+        if headers.get("Expires"):
+            try:
+                return parsedate_to_datetime(headers["Expires"]).timestamp()
+            except (TypeError, ValueError):
+                return now
+        return now
+
+    def storable(self, headers: Any) -> bool:
+        # Worth storing only if it stays fresh for a while or can be revalidated
+        expires = self.freshness(headers)
+        if expires is None:
+            return False
+        return expires > time.time() or bool(headers.get("ETag") or headers.get("Last-Modified"))
+
+    def put(self, key: str, r: requests.Response, body: bytes) -> Dict[str, Any]:
+        expires = self.freshness(r.headers) or time.time()
+        etag, last_modified = r.headers.get("ETag"), r.headers.get("Last-Modified")
+        headers = stored_headers(r, body)
+        meta = {"url": r.url, "status": r.status_code, "headers": headers, "expires": expires, "etag": etag, "last_modified": last_modified}
+        meta_path, body_path = self._files(key)
+        with self._lock:
+            index = self._load_index()
+            with open(body_path + ".tmp", "wb") as f:
+                f.write(body)
+            os.replace(body_path + ".tmp", body_path)
+            with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+            os.replace(meta_path + ".tmp", meta_path)
+            index[key] = [len(body), time.time()]
+            self._evict(index)
+        return meta
+
+    def revalidated(self, key: str, meta: Dict[str, Any], r: requests.Response) -> Dict[str, Any]:
+        # 304: the stored body is still good, refresh freshness and validators
+        expires = self.freshness(r.headers)
+        meta["expires"] = expires if expires is not None else time.time()
+        meta["etag"] = r.headers.get("ETag") or meta.get("etag")
+        meta["last_modified"] = r.headers.get("Last-Modified") or meta.get("last_modified")
+        meta["headers"].update({k: v for k, v in (("ETag", meta["etag"]), ("Last-Modified", meta["last_modified"])) if v})
+        meta_path, _ = self._files(key)
+        with self._lock:
+            with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+            os.replace(meta_path + ".tmp", meta_path)
+        return meta
+
+    def _evict(self, index: Dict[str, List[float]]) -> None:
+        total = sum(int(v[0]) for v in index.values())
+        for key, (size, _) in sorted(index.items(), key=lambda kv: kv[1][1]):
+            if total <= self.max_bytes:
+                break
+            for p in self._files(key):
+                try:
+                    os.remove(p)
+                except OSError:
+                    pass
+            del index[key]
+            total -= int(size)
+
+
+DISK_CACHE = DiskCache()
+
+
+def stored_headers(r: requests.Response, body: bytes) -> Dict[str, str]:
+    # The body is stored decoded, so drop transfer details of the original encoding
+    headers = {k: v for k, v in r.headers.items() if k.lower() not in ("content-encoding", "content-length", "transfer-encoding", "set-cookie")}
+    headers["Content-Length"] = str(len(body))
+    return headers
+
+
+def make_response(url: str, status: int, headers: Dict[str, str], body: bytes) -> requests.Response:
+    # Response object backed by bytes we already have (disk cache); works with stream=True readers too
+    r = requests.Response()
+    r.url = url
+    r.status_code = status
+    r.headers = requests.structures.CaseInsensitiveDict(headers)
+    r.encoding = requests.utils.get_encoding_from_headers(r.headers)
+    r.raw = io.BytesIO(body)
+    r.reason = "OK" if status == 200 else ""
+    return r
+
+
+class ReplayMiss(Exception):
+    """Raised in --replay mode for a request that is not in the archive."""
+
+
+class HttpArchive:
+    """--record / --replay: raw GET responses (status, headers, gzipped body, elapsed) on disk.
+
+    Recording stores the final response of every live GET, keyed like the disk cache. Replay
+    serves them back instead of the network (optionally sleeping latency_scale x the recorded
+    time) and stubs webhook posts, so a run can be benchmarked offline and repeated. Both modes
+    bypass the disk cache and conditional requests so the archive always holds full bodies, and
+    replay keeps its state under <dir>/state, wiped at start, so every replay sees the same items.
+    The JST date of the recording is kept in archive.json and replay runs use it as "today".
+    """
+
+    def __init__(self) -> None:
+        self.mode = ""  # "", "record" or "replay"
+        self.path = ""
+        self.today = ""  # pinned yyyymmdd while replaying
+        self.latency_scale = 0.0
+        self._lock = threading.Lock()
+        self.served = 0
+        self.stubbed_posts = 0
+
+    def configure(self, mode: str, path: str, latency_scale: float = 0.0) -> None:
+        self.mode, self.path, self.latency_scale = mode, path, latency_scale
+        info_path = os.path.join(path, "archive.json")
+        if mode == "record":
+            ensure_dir(path)
+            with open(info_path, "w", encoding="utf-8") as f:
+                json.dump({"recorded_on": yyyymmdd_jst()}, f)
+        elif mode == "replay":
+            if not os.path.isdir(path):
+                raise FileNotFoundError(f"replay archive not found: {path}")
+            shutil.rmtree(self.state_dir, ignore_errors=True)
+            try:
+                with open(info_path, "r", encoding="utf-8") as f:
+                    self.today = str(json.load(f).get("recorded_on") or "")
+            except (OSError, ValueError):
+                self.today = ""
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    @property
+    def state_dir(self) -> str:
+        return os.path.join(self.path, "state")
+
+    def _files(self, url: str, params: Optional[Dict[str, Any]]) -> Tuple[str, str]:
+        key = DiskCache.key(url, params)
+        return os.path.join(self.path, f"{key}.json"), os.path.join(self.path, f"{key}.body.gz")
+
+    def record(self, url: str, params: Optional[Dict[str, Any]], r: requests.Response, elapsed: float) -> requests.Response:
+        body = bytes(read_body(r))
+        meta = {"url": r.url, "status": r.status_code, "headers": stored_headers(r, body), "elapsed": round(elapsed, 4)}
+        meta_path, body_path = self._files(url, params)
+        with open(body_path + ".tmp", "wb") as f:
+            f.write(gzip.compress(body, compresslevel=6))
+        os.replace(body_path + ".tmp", body_path)
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(meta_path + ".tmp", meta_path)
+        return make_response(meta["url"], meta["status"], meta["headers"], body)
+
+    def replay(self, url: str, params: Optional[Dict[str, Any]]) -> requests.Response:
+        meta_path, body_path = self._files(url, params)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = gzip.decompress(f.read())
+        except FileNotFoundError:
+            raise ReplayMiss(f"not in archive: {url}") from None
+        if self.latency_scale > 0:
+            time.sleep(time_left(float(meta.get("elapsed", 0)) * self.latency_scale))
+        with self._lock:
+            self.served += 1
+        return make_response(meta["url"], meta["status"], meta["headers"], body)
+
+    def stub_post(self, webhook_url: str) -> None:
+        with self._lock:
+            self.stubbed_posts += 1
+
+
+HTTP_ARCHIVE = HttpArchive()
+
+
+def _send(url: str, params: Optional[Dict[str, Any]], headers: Dict[str, str], timeout: int, stream: bool) -> requests.Response:
+    # One GET on the pooled session: rate limited, retried on transient failures
+    limiter = RATE_LIMITS.get(url)
+    attempts = 1 if _probe.get() else RETRY.attempts
+    attempt = 0
+    while True:
+        attempt += 1
+        limiter.acquire()
+        started = time.monotonic()
+        try:
+            if HTTP_ARCHIVE.replaying:
+                r = HTTP_ARCHIVE.replay(url, params)
+            else:
+                r = SESSIONS.session(url).get(url, params=params, headers=headers, timeout=time_left(timeout), stream=stream)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            limiter.release()
+            if attempt >= attempts:
+                raise
+            wait = RETRY.delay(attempt)
+            note(f"retry {attempt}/{attempts - 1} in {wait:.1f}s: {urlparse(url).netloc}: {type(e).__name__}")
+            time.sleep(time_left(wait))
+            continue
+        except BaseException:
+            limiter.release()
+            raise
+
+        if r.status_code in RETRY.RETRY_STATUSES and attempt < attempts:
+            wait = RETRY.delay(attempt, r.headers.get("Retry-After"))
+            r.close()
+            limiter.release()
+            note(f"retry {attempt}/{attempts - 1} in {wait:.1f}s: {urlparse(url).netloc}: HTTP {r.status_code}")
+            time.sleep(time_left(wait))
+            continue
+        break
+
+    if HTTP_ARCHIVE.mode == "record":
+        try:
+            r = HTTP_ARCHIVE.record(url, params, r, time.monotonic() - started)
+        finally:
+            limiter.release()
+        return r
+    if stream:
+        # A streamed body is still in flight until the caller closes the response
+        _release_on_close(r, limiter)
+    else:
+        limiter.release()
+    return r
+
+
+def _conditional_headers(headers: Dict[str, str], etag: Optional[str], last_modified: Optional[str]) -> None:
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+
+def http_get(
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    timeout: int = 20,
+    validators: Optional[Dict[str, str]] = None,
+    stream: bool = False,
+) -> requests.Response:
     headers = {
         "User-Agent": "watchtower-notifier/1.0 (+https://github.com/)",
         "Accept": "*/*",
     }
-    r = requests.get(url, params=params, headers=headers, timeout=timeout)
-    r.raise_for_status()
+    # Recording/replaying wants full bodies every time: no disk cache, no conditional requests
+    archived = bool(HTTP_ARCHIVE.mode)
+    validators = {} if archived else validators or {}
+
+    key = DISK_CACHE.key(url, params) if DISK_CACHE.enabled and not archived else ""
+    meta = DISK_CACHE.get(key) if key else None
+    if meta is not None:
+        # The caller already processed this exact representation: same as a 304
+        same = bool(validators) and (validators.get("etag"), validators.get("last_modified")) == (meta.get("etag"), meta.get("last_modified"))
+        if time.time() < float(meta.get("expires") or 0):
+            if same:
+                raise NotModified(url)
+            return make_response(meta["url"], meta["status"], meta["headers"], DISK_CACHE.body(key))
+        _conditional_headers(headers, meta.get("etag"), meta.get("last_modified"))
+    else:
+        _conditional_headers(headers, validators.get("etag"), validators.get("last_modified"))
+
+    r = _send(url, params, headers, timeout, stream)
+
+    if r.status_code == 304 and meta is not None:
+        r.close()
+        meta = DISK_CACHE.revalidated(key, meta, r)
+        if validators and (validators.get("etag"), validators.get("last_modified")) == (meta.get("etag"), meta.get("last_modified")):
+            raise NotModified(url)
+        return make_response(meta["url"], meta["status"], meta["headers"], DISK_CACHE.body(key))
+    if r.status_code == 304 and validators:
+        r.close()
+        raise NotModified(url)
+    try:
+        r.raise_for_status()
+    except Exception:
+        r.close()
+        raise
+
+    if key and r.status_code == 200 and DISK_CACHE.storable(r.headers):
+        # Cacheable: take the whole body (size-capped) and hand the caller a copy backed by it
+        body = bytes(read_body(r))
+        meta = DISK_CACHE.put(key, r, body)
+        return make_response(meta["url"], meta["status"], meta["headers"], body)
     return r
 
 
+def iter_body(r: requests.Response, max_bytes: Optional[int] = None, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Yield a streamed response body chunk by chunk, enforcing a size cap and the target deadline."""
+    limit = max_bytes or SESSIONS.max_body_bytes
+    declared = r.headers.get("Content-Length", "")
+    try:
+        if declared.isdigit() and int(declared) > limit:
+            raise BodyTooLarge(f"{r.url}: Content-Length {declared} > {limit} bytes")
+        total = 0
+        for chunk in r.iter_content(chunk_size):
+            total += len(chunk)
+            if total > limit:
+                raise BodyTooLarge(f"{r.url}: body exceeds {limit} bytes")
+            check_deadline()
+            yield chunk
+    finally:
+        r.close()
+
+
+def read_body(r: requests.Response, max_bytes: Optional[int] = None) -> bytearray:
+    buf = bytearray()
+    for chunk in iter_body(r, max_bytes):
+        buf += chunk
+    return buf
+
+
+def iter_slices(buf: bytearray, size: int = 64 * 1024) -> Iterator[memoryview]:
+    view = memoryview(buf)
+    for i in range(0, len(buf), size):
+        yield view[i:i + size]
+
+
+def check_body_digest(st: Dict[str, Any], body: bytearray) -> None:
+    # For servers without validators: same bytes as last time means nothing to parse
+    check_digest(st, hashlib.sha1(body).hexdigest())
+
+
+def check_digest(st: Dict[str, Any], digest: str) -> None:
+    if st.get("body_sha1") == digest:
+        raise BodyUnchanged(digest)
+    st["body_sha1"] = digest
+
+
+class _BodyStream:
+    # File-like view over the body buffer: feedparser read()s it as-is instead of copying
+    def __init__(self, buf: bytearray):
+        self._buf = buf
+
+    def read(self) -> bytearray:
+        return self._buf
+
+
+def remember_validators(st: Dict[str, Any], url: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+    # Validators live in the target state next to seen_ids, keyed by the URL they belong to
+    v = {k: x for k, x in (("etag", etag), ("last_modified", last_modified)) if x}
+    st["validators"] = {url: v} if v else {}
+
+
 # -----------------------
 # Fetchers (targets)
 # -----------------------
 
-def fetch_rss(url: str, max_items: int) -> List[Dict[str, Any]]:
-    # feedparser handles RSS1.0/2.0/Atom
-    d = feedparser.parse(url)
+RDF_ABOUT = "{http://www.w3.org/1999/02/22-rdf-syntax-ns#}about"
+FEED_ROOTS = ("rss", "RDF", "feed")
+FEED_ENTRIES = ("item", "entry")
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _feed_item(elem: ET.Element, base_url: str) -> Dict[str, Any]:
+    fields: Dict[str, str] = {}
+    dates: Dict[str, str] = {}
+    link = ""
+    permalink = True
+    for child in elem:
+        name = _local(child.tag)
+        if name == "link":
+            href = child.get("href")
+            if href is None:  # RSS
+                link = link or (child.text or "")
+            elif child.get("rel", "alternate") == "alternate" and not link:  # Atom
+                link = href
+            continue
+        if name == "guid" and child.get("isPermaLink") == "false":
+            permalink = False
+        text = "".join(child.itertext())
+        fields.setdefault(name, text)
+        # feedparser maps these onto published / updated; the last one in the entry wins
+        if name in ("pubDate", "published", "issued"):
+            dates["published"] = text
+        elif name in ("updated", "date", "modified"):
+            dates["updated"] = text
+
+    # Mirror feedparser: a guid / Atom id is resolved against the feed URL and doubles as the link
+    # only when it is a permalink (isPermaLink="false" guids stay verbatim); rdf:about is kept
+    # verbatim; without any id, a hash of link/title
+    guid = (fields.get("guid") or fields.get("id") or "").strip()
+    if guid:
+        entry_id = urljoin(base_url, guid) if permalink else guid
+        if not link and permalink:
+            link = entry_id
+    else:
+        entry_id = (elem.get(RDF_ABOUT) or "").strip()
+    link = safe_text(urljoin(base_url, link.strip()) if link.strip() else "")
+    title = safe_text(fields.get("title"))
+    summary = fields.get("description") or fields.get("summary") or fields.get("encoded") or fields.get("content")
+    published = dates.get("published") or dates.get("updated") or ""
+    return {
+        "id": safe_text(entry_id) or sha1(link or title),
+        "title": title,
+        "url": link,
+        "summary": safe_text(summary)[:280],
+        "published": safe_text(published),
+        "source": "RSS",
+    }
+
+
+def iter_xml_elements(chunks: Iterable[bytes], names: Tuple[str, ...], roots: Optional[Tuple[str, ...]] = None) -> Iterator[ET.Element]:
+    """Pull-parse an XML byte stream and yield each element named in `names` once it is complete.
+
+    The element is removed from its parent after the consumer is done with it, so memory stays flat
+    however long the document is. Raises ET.ParseError on malformed input or an unexpected root.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    stack: List[ET.Element] = []
+    for chunk in chunks:
+        parser.feed(chunk)
+        for event, elem in parser.read_events():
+            if event == "start":
+                if not stack and roots is not None and _local(elem.tag) not in roots:
+                    raise ET.ParseError(f"unexpected document root: <{_local(elem.tag)}>")
+                stack.append(elem)
+                continue
+            stack.pop()
+            if stack and _local(elem.tag) in names:
+                yield elem
+                stack[-1].remove(elem)
+    parser.close()
+
+
+def iter_feed_entries(chunks: Iterable[bytes], base_url: str = "") -> Iterator[Dict[str, Any]]:
+    """Incrementally parse RSS 1.0/2.0/Atom, yielding each item as soon as its element closes."""
+    for elem in iter_xml_elements(chunks, FEED_ENTRIES, FEED_ROOTS):
+        yield _feed_item(elem, base_url)
+
+
+def _items_from_feedparser(body: bytearray, base_url: str, content_type: str, max_items: int) -> List[Dict[str, Any]]:
+    import feedparser  # only needed for feeds the streaming parser rejects
+
+    response_headers = {
+        "content-location": base_url,  # base for relative links/ids, same as when feedparser fetched the URL itself
+        "content-type": content_type,
+    }
+    d = feedparser.parse(_BodyStream(body), response_headers=response_headers)
     items: List[Dict[str, Any]] = []
     for e in d.entries[:max_items]:
         link = safe_text(getattr(e, "link", ""))
@@ -96,19 +1099,115 @@ def fetch_rss(url: str, max_items: int) -> List[Dict[str, Any]]:
     return items
 
 
-def fetch_egov_updates(max_items: int) -> List[Dict[str, Any]]:
-    # e-Gov Law API v1: https://laws.e-gov.go.jp/api/1/updatelawlists/{yyyyMMdd}
-    date_str = yyyymmdd_jst()
-    url = f"https://laws.e-gov.go.jp/api/1/updatelawlists/{date_str}"
-    xml_text = http_get(url).text
+def fetch_rss(
+    url: str,
+    max_items: int,
+    st: Optional[Dict[str, Any]] = None,
+    max_bytes: Optional[int] = None,
+    early_stop: bool = True,
+    body_hash: bool = True,
+) -> List[Dict[str, Any]]:
+    # Download through the managed client and parse while streaming; stop at max_items
+    # or at the first already-seen, unchanged entry (feeds list newest first)
+    r = http_get(url, validators=(st or {}).get("validators", {}).get(url), stream=True)
+    if st is not None:
+        remember_validators(st, url, r.headers.get("ETag"), r.headers.get("Last-Modified"))
+    seen = set((st or {}).get("seen_ids", [])) if early_stop else set()
+    fingerprints = (st or {}).get("fingerprints", {})
+
+    buf = bytearray()
+    digest = hashlib.sha1() if body_hash and st is not None else None
+    exhausted = False
+    buffering = True
+
+    def tee() -> Iterator[bytes]:
+        # Keep what was read so far in case we have to fall back to feedparser; hash as we go
+        nonlocal exhausted
+        for chunk in iter_body(r, max_bytes):
+            if buffering:
+                buf.extend(chunk)
+            if digest is not None:
+                digest.update(chunk)
+            yield chunk
+        exhausted = True
+
+    body = tee()
+    items: List[Dict[str, Any]] = []
+    try:
+        for it in iter_feed_entries(body, r.url):
+            if it["id"] in seen and fingerprints.get(it["id"], "") in ("", item_fingerprint(it)):
+                break
+            items.append(it)
+            if len(items) >= max_items:
+                break
+        if digest is not None and not exhausted and not (r.headers.get("ETag") or r.headers.get("Last-Modified")):
+            # Without validators the digest is the only "unchanged" check: hash the rest of the
+            # body so it can be compared, without buffering it (hub links sit before the entries)
+            buffering = False
+            for _ in body:
+                pass
+    except ET.ParseError:
+        # Not well-formed XML (HTML entities, exotic encodings...): feedparser is lenient
+        for _ in body:
+            pass
+        items = _items_from_feedparser(buf, r.url, r.headers.get("Content-Type", ""), max_items)
+    finally:
+        r.close()
+
+    if st is not None:
+        discover_hub(st, url, r, buf)
+    if digest is not None:
+        if exhausted:
+            # Same bytes as last time: skip dedup, scoring and the state write
+            check_digest(st, digest.hexdigest())
+        else:
+            # Stopped early (the validators cover "unchanged"), so the digest is incomplete;
+            # never compare against a stale one
+            st.pop("body_sha1", None)
+    return items
+
+
+HUB_LINK_RE = re.compile(rb"<(?:[A-Za-z0-9_]+:)?link\b[^>]*>", re.IGNORECASE)
+REL_RE = re.compile(rb"""\brel\s*=\s*["']([^"']+)["']""", re.IGNORECASE)
+HREF_RE = re.compile(rb"""\bhref\s*=\s*["']([^"']+)["']""", re.IGNORECASE)
+
+
+def discover_hub(st: Dict[str, Any], url: str, r: requests.Response, head: bytearray) -> None:
+    # WebSub discovery: Link headers first, then <link rel="hub"/"self"> near the top of the feed
+    hub = r.links.get("hub", {}).get("url", "")
+    topic = r.links.get("self", {}).get("url", "")
+    for m in HUB_LINK_RE.finditer(bytes(head[:64 * 1024])):
+        rel, href = REL_RE.search(m.group(0)), HREF_RE.search(m.group(0))
+        if not rel or not href:
+            continue
+        rels = rel.group(1).decode("utf-8", "replace").lower().split()
+        if "hub" in rels and not hub:
+            hub = href.group(1).decode("utf-8", "replace")
+        if "self" in rels and not topic:
+            topic = href.group(1).decode("utf-8", "replace")
+    if hub:
+        st["websub_hub"] = {"hub": urljoin(url, hub), "topic": urljoin(url, topic or url)}
+    else:
+        st.pop("websub_hub", None)
 
-    root = ET.fromstring(xml_text)
-    appl = root.find(".//ApplData")
-    if appl is None:
-        return []
 
+def parse_feed_body(body: bytearray, base_url: str, content_type: str, max_items: int) -> List[Dict[str, Any]]:
+    # Whole-document parse for content we already hold (WebSub pushes)
+    try:
+        items: List[Dict[str, Any]] = []
+        for it in iter_feed_entries(iter_slices(body), base_url):
+            items.append(it)
+            if len(items) >= max_items:
+                break
+        return items
+    except ET.ParseError:
+        return _items_from_feedparser(body, base_url, content_type, max_items)
+
+
+def _egov_items(chunks: Iterable[Any], date_str: str, seen: set, max_items: int) -> List[Dict[str, Any]]:
+    # Stream LawNameListInfo nodes one at a time; stop once max_items new ones are found
     items: List[Dict[str, Any]] = []
-    for info in appl.findall(".//LawNameListInfo"):
+    for info in iter_xml_elements(chunks, ("LawNameListInfo",)):
         law_name = safe_text(info.findtext("LawName"))
         law_no = safe_text(info.findtext("LawNo"))
         amend = safe_text(info.findtext("AmendName"))
@@ -116,6 +1215,8 @@ def fetch_egov_updates(max_items: int) -> List[Dict[str, Any]]:
         promulg = safe_text(info.findtext("PromulgationDate"))
         # Stable-ish ID
         entry_id = sha1(f"{date_str}|{law_no}|{law_name}|{amend}|{enforced}")
+        if entry_id in seen:
+            continue
 
         # Link: best-effort to e-Gov law search site (by name) – user can click and search quickly
         link = "https://laws.e-gov.go.jp/"
@@ -130,33 +1231,221 @@ def fetch_egov_updates(max_items: int) -> List[Dict[str, Any]]:
             "published": date_str,
             "source": "e-Gov法令API",
         })
+        if len(items) >= max_items:
+            break
+    return items
 
-    return items[:max_items]
 
+def shift_yyyymmdd(date_str: str, days: int) -> str:
+    return (datetime.strptime(date_str, "%Y%m%d") + timedelta(days=days)).strftime("%Y%m%d")
 
-def fetch_jgrants(keywords: List[str], acceptance: str, sort: str, order: str, max_items: int) -> List[Dict[str, Any]]:
+
+def egov_catch_up_days(last_date: Optional[str], today: str, max_days: int) -> List[str]:
+    # Past days from the last successful date (inclusive: it may have been published late) up to yesterday
+    if not last_date or last_date >= today:
+        return []
+    end = datetime.strptime(today, "%Y%m%d")
+    start = max(datetime.strptime(last_date, "%Y%m%d"), end - timedelta(days=max_days))
+    days = []
+    d = start
+    while d < end:
+        days.append(d.strftime("%Y%m%d"))
+        d += timedelta(days=1)
+    return days
+
+
+def egov_past_day_body(date_str: str) -> bytearray:
+    path = os.path.join(EGOV_ARCHIVE_DIR, f"{date_str}.xml")
+    try:
+        if not HTTP_ARCHIVE.mode:  # --record/--replay go through the HTTP archive instead
+            with open(path, "rb") as f:
+                return bytearray(f.read())
+    except FileNotFoundError:
+        pass
+
+    body = read_body(http_get(EGOV_UPDATES_URL.format(date=date_str), stream=True))
+    if date_str <= shift_yyyymmdd(yyyymmdd_jst(), -EGOV_ARCHIVE_AFTER_DAYS) and not HTTP_ARCHIVE.replaying:
+        ensure_dir(EGOV_ARCHIVE_DIR)
+        with open(path + ".tmp", "wb") as f:
+            f.write(body)
+        os.replace(path + ".tmp", path)
+    return body
+
+
+def fetch_egov_updates(
+    max_items: int,
+    st: Optional[Dict[str, Any]] = None,
+    body_hash: bool = True,
+    catch_up: bool = False,
+    catch_up_max_days: int = 7,
+) -> List[Dict[str, Any]]:
+    # e-Gov Law API v1: https://laws.e-gov.go.jp/api/1/updatelawlists/{yyyyMMdd}
+    date_str = yyyymmdd_jst()
+    seen = set((st or {}).get("seen_ids", []))
+
+    # Catch-up: days missed since the last successful run, in parallel, from the archive when possible
+    past: List[Dict[str, Any]] = []
+    days = egov_catch_up_days((st or {}).get("egov_last_date"), date_str, catch_up_max_days) if catch_up else []
+    if days:
+        with ThreadPoolExecutor(max_workers=min(4, len(days)), thread_name_prefix="egov") as pool:
+            # copy_context here, in the caller: the target deadline/probe/notes must reach the workers
+            futures = [pool.submit(contextvars.copy_context().run, egov_past_day_body, d) for d in days]
+            bodies = [f.result() for f in futures]
+        for day, body in sorted(zip(days, bodies), reverse=True):
+            past.extend(_egov_items(iter_slices(body), day, seen, max_items))
+    if catch_up and st is not None:
+        # Lag one day behind, so yesterday's list is fetched again until it has settled
+        st["egov_last_date"] = shift_yyyymmdd(date_str, -1)
+
+    url = EGOV_UPDATES_URL.format(date=date_str)
+    try:
+        r = http_get(url, validators=(st or {}).get("validators", {}).get(url), stream=True)
+    except NotModified:
+        if days:
+            return past
+        raise
+    if st is not None:
+        remember_validators(st, url, r.headers.get("ETag"), r.headers.get("Last-Modified"))
+
+    try:
+        chunks: Iterator[Any]
+        if body_hash and st is not None:
+            buf = read_body(r)
+            try:
+                check_body_digest(st, buf)
+            except BodyUnchanged:
+                if days:
+                    return past
+                raise
+            chunks = iter_slices(buf)
+        else:
+            chunks = iter_body(r)
+        items = _egov_items(chunks, date_str, seen, max_items)
+    finally:
+        r.close()
+
+    return items + past
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire ttl_sec after they were stored.
+
+    Concurrent misses on the same key are collapsed into a single load.
+    """
+
+    def __init__(self, ttl_sec: float = 240.0, max_entries: int = 256):
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._loading: Dict[Any, threading.Lock] = {}
+
+    def configure(self, ttl_sec: float, max_entries: int) -> None:
+        with self._lock:
+            self.ttl_sec = float(ttl_sec)
+            self.max_entries = max(1, int(max_entries))
+            self._data.clear()
+
+    def _lookup(self, key: Any) -> Tuple[bool, Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return False, None
+        if time.monotonic() - entry[0] > self.ttl_sec:
+            del self._data[key]
+            return False, None
+        self._data.move_to_end(key)
+        return True, entry[1]
+
+    def get_or_load(self, key: Any, loader: Callable[[], Any]) -> Any:
+        if self.ttl_sec <= 0:
+            return loader()
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self.hits += 1
+                return value
+            key_lock = self._loading.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                # someone else may have loaded it while we waited
+                found, value = self._lookup(key)
+                if found:
+                    self.hits += 1
+                    return value
+                self.misses += 1
+            try:
+                value = loader()
+                with self._lock:
+                    self._data[key] = (time.monotonic(), value)
+                    self._data.move_to_end(key)
+                    while len(self._data) > self.max_entries:
+                        self._data.popitem(last=False)
+                return value
+            finally:
+                with self._lock:
+                    self._loading.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._data)}
+
+
+# jgrants keyword queries, shared by every target and cycle in this process
+JGRANTS_CACHE = TTLCache()
+
+
+def fetch_jgrants(
+    keywords: List[str],
+    acceptance: str,
+    sort: str,
+    order: str,
+    max_items: int,
+    concurrency: int = 4,
+) -> List[Dict[str, Any]]:
     # Digital Agency developer site shows public endpoint:
     # https://api.jgrants-portal.go.jp/exp/v1/public/subsidies
-    base = "https://api.jgrants-portal.go.jp/exp/v1/public/subsidies"
+    base = JGRANTS_SUBSIDIES_URL
 
-    all_results: Dict[str, Dict[str, Any]] = {}
-    for kw in keywords:
+    def query(kw: str) -> List[Dict[str, Any]]:
         params = {
             "keyword": kw,
             "sort": sort,
             "order": order,
             "acceptance": acceptance,
         }
-        r = http_get(base, params=params).json()
-        for row in r.get("result", []) or []:
-            sid = safe_text(row.get("id"))
-            if not sid:
-                continue
-            all_results[sid] = row
+        key = (base, tuple(sorted(params.items())))
+        return JGRANTS_CACHE.get_or_load(key, lambda: http_get(base, params=params).json().get("result", []) or [])
 
-    # Convert to items (sorted by end date if present)
-    def end_dt(x: Dict[str, Any]) -> str:
-        return safe_text(x.get("acceptance_end_datetime"))
+    # One request per keyword, in parallel; merge into the dedup map as each one lands
+    all_results: Dict[str, Dict[str, Any]] = {}
+    failed: List[Tuple[str, Exception]] = []
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(keywords) or 1)), thread_name_prefix="jgrants") as pool:
+        # copy_context: keep the target deadline/notes visible inside the worker threads
+        futures = {pool.submit(contextvars.copy_context().run, query, kw): kw for kw in keywords}
+        for fut in as_completed(futures):
+            try:
+                rows = fut.result()
+            except Exception as e:
+                failed.append((futures[fut], e))
+                continue
+            for row in rows:
+                sid = safe_text(row.get("id"))
+                if not sid:
+                    continue
+                all_results[sid] = row
+
+    if failed:
+        if len(failed) == len(keywords):
+            raise failed[0][1]
+        for kw, e in failed:
+            note(f"partial: keyword '{kw}' failed: {safe_text(e) or type(e).__name__}")
+
+    # Convert to items (sorted by end date if present; id breaks ties since arrival order varies)
+    def end_dt(x: Dict[str, Any]) -> Tuple[str, str]:
+        return safe_text(x.get("acceptance_end_datetime")), safe_text(x.get("id"))
 
     rows = list(all_results.values())
     rows.sort(key=end_dt)
@@ -235,7 +1524,7 @@ def post_slack(webhook_url: str, text: str) -> None:
         "text": text,
         "mrkdwn": True,
     }
-    requests.post(webhook_url, json=payload, timeout=20).raise_for_status()
+    SESSIONS.session(webhook_url).post(webhook_url, json=payload, timeout=20).raise_for_status()
 
 
 def post_discord(webhook_url: str, title: str, description: str, url: str) -> None:
@@ -246,93 +1535,1330 @@ def post_discord(webhook_url: str, title: str, description: str, url: str) -> No
             "url": url,
         }]
     }
-    requests.post(webhook_url, json=payload, timeout=20).raise_for_status()
+    SESSIONS.session(webhook_url).post(webhook_url, json=payload, timeout=20).raise_for_status()
 
 
-def notify_all(cfg: Dict[str, Any], headline: str, body: str, url: str) -> None:
-    slack_url = os.getenv("SLACK_WEBHOOK_URL", "").strip()
-    discord_url = os.getenv("DISCORD_WEBHOOK_URL", "").strip()
+def notifier_calls(cfg: Dict[str, Any], headline: str, body: str, url: str) -> List[Tuple[str, Callable[[], None]]]:
+    # (webhook url, call) pairs for every enabled channel
+    replay = HTTP_ARCHIVE.replaying
+    slack_url = os.getenv("SLACK_WEBHOOK_URL", "").strip() or ("replay:slack" if replay else "")
+    discord_url = os.getenv("DISCORD_WEBHOOK_URL", "").strip() or ("replay:discord" if replay else "")
 
+    calls: List[Tuple[str, Callable[[], None]]] = []
     if cfg.get("notifiers", {}).get("slack") and slack_url:
-        post_slack(slack_url, f"{headline}\n{body}\n{url}")
+        calls.append((slack_url, functools.partial(post_slack, slack_url, f"{headline}\n{body}\n{url}")))
 
     if cfg.get("notifiers", {}).get("discord") and discord_url:
-        post_discord(discord_url, headline, f"{body}\n\n{url}", url)
+        calls.append((discord_url, functools.partial(post_discord, discord_url, headline, f"{body}\n\n{url}", url)))
+
+    if replay:
+        # Offline runs build every message but never post it
+        calls = [(w, functools.partial(HTTP_ARCHIVE.stub_post, w)) for w, _ in calls]
+    return calls
+
+
+def notify_all(cfg: Dict[str, Any], headline: str, body: str, url: str) -> None:
+    for _, call in notifier_calls(cfg, headline, body, url):
+        call()
 
 
 # -----------------------
-# Core
+# Targets (bulk import / store)
 # -----------------------
 
-def run_once(cfg: Dict[str, Any]) -> None:
-    print(f"[{now_jst_str()}] run_once start")
+# CSV cells are text; only these target keys become what a YAML target would hold
+# (ids like "001" and titles like "2024" must stay strings)
+TARGET_INT_KEYS = {"max_items", "interval_sec", "timeout_sec", "max_body_bytes", "keyword_concurrency", "catch_up_max_days"}
+TARGET_BOOL_KEYS = {"early_stop", "body_hash", "detect_updates", "adaptive", "websub", "catch_up"}
+
+
+def _target_value(key: str, v: str) -> Any:
+    v = v.strip()
+    if key in TARGET_INT_KEYS and v.lstrip("-").isdigit():
+        return int(v)
+    if key in TARGET_BOOL_KEYS and v.lower() in ("true", "false", "1", "0", "yes", "no"):
+        return v.lower() in ("true", "1", "yes")
+    return v
+
+
+def load_target_file(path: str, defaults: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Compact target definitions from an OPML file (outline xmlUrl/title) or a CSV file
+    with a header row (url required; id, title and any other target key optional)."""
+    rows: List[Dict[str, Any]] = []
+    if path.lower().endswith(".csv"):
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            for rec in csv.DictReader(f):
+                rows.append({k.strip(): _target_value(k.strip(), v) for k, v in rec.items() if k and v and v.strip()})
+    else:
+        for _, elem in ET.iterparse(path):
+            if _local(elem.tag) == "outline" and elem.get("xmlUrl"):
+                rows.append({"url": elem.get("xmlUrl"), "title": elem.get("title") or elem.get("text") or ""})
+            elem.clear()
+
+    targets = []
+    for row in rows:
+        url = str(row.get("url", "")).strip()
+        if not url:
+            continue
+        t = {**defaults, **row, "url": url}
+        t.setdefault("kind", "rss")
+        t["id"] = str(t.get("id") or f"feed-{sha1(url)[:10]}")
+        if not t.get("title"):
+            t["title"] = urlparse(url).netloc
+        targets.append(t)
+    return targets
+
+
+def expand_targets(cfg: Dict[str, Any], base_dir: str = ".") -> None:
+    # Append targets from cfg["target_files"] (relative to the config file); ids and urls
+    # already defined earlier win, so a hand-written block can override an imported feed
+    targets = list(cfg.get("targets", []) or [])
+    ids = {t["id"] for t in targets}
+    urls = {t.get("url") for t in targets if t.get("url")}
+    defaults = cfg.get("target_defaults", {}) or {}
+    for name in cfg.get("target_files", []) or []:
+        added = 0
+        for t in load_target_file(os.path.join(base_dir, name), defaults):
+            if t["id"] in ids or t["url"] in urls:
+                log(f"  - {t['id']}: skipped, duplicate {'id' if t['id'] in ids else 'url'} ({name})")
+                continue
+            ids.add(t["id"])
+            urls.add(t["url"])
+            targets.append(t)
+            added += 1
+        log(f"targets: {added} imported from {name}")
+    cfg["targets"] = targets
+
+
+class TargetStore:
+    """In-memory index of targets and their next due time for --once / async cycles.
+
+    With run.skip_not_due the interval_sec of each target is honored by one-shot runs too:
+    only due targets are processed (and only their state files opened). Due targets come off a
+    heap keyed by next due time and each cycle appends just their new times to a journal, so a
+    cycle over thousands of mostly idle feeds costs in proportion to the due ones. The journal
+    (<state dir>/_schedule.jsonl, compacted on load) is shared by separate cron runs and shards.
+    """
+
+    COMPACT_LINES = 1000
+
+    def __init__(self, targets: List[Dict[str, Any]], default_interval: float, path: Optional[str] = None):
+        self.targets = {t["id"]: t for t in targets}
+        self.default_interval = default_interval
+        self.path = path or os.path.join(state_dir(), "_schedule.jsonl")
+        schedule, lines = self._load()
+        if lines > self.COMPACT_LINES:
+            self._compact(schedule)
+        self._next = {tid: schedule.get(tid, 0.0) for tid in self.targets}
+        self._heap = [(when, tid) for tid, when in self._next.items()]
+        heapq.heapify(self._heap)
+        self._out: Dict[str, float] = {}  # handed out by due(), not yet rescheduled by ran()
+
+    def _load(self) -> Tuple[Dict[str, float], int]:
+        schedule: Dict[str, float] = {}
+        lines = 0
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        schedule.update({k: float(v) for k, v in json.loads(line).items()})
+                    except (ValueError, AttributeError):
+                        pass  # a line cut short by a crash
+        except OSError:
+            pass
+        return schedule, lines
+
+    def _compact(self, schedule: Dict[str, float]) -> None:
+        # A line appended by another worker while this runs may be lost: those targets are
+        # simply due again, and their state still dedups
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(json.dumps(schedule) + "\n")
+        os.replace(tmp, self.path)
+
+    def _interval(self, tid: str) -> float:
+        return float(self.targets[tid].get("interval_sec", self.default_interval))
+
+    def due(self, now: float, owns: Callable[[str], bool] = lambda tid: True) -> List[Dict[str, Any]]:
+        """Due targets this worker owns; they stay off the heap until ran() reschedules them."""
+        # Whatever a failed cycle handed out without running is due again
+        later = [(when, tid) for tid, when in self._out.items()]
+        self._out = {}
+        for entry in later:
+            heapq.heappush(self._heap, entry)
+        due = []
+        later = []
+        while self._heap and self._heap[0][0] <= now:
+            when, tid = heapq.heappop(self._heap)
+            if self._next.get(tid) != when:
+                continue  # superseded by a later ran()
+            if owns(tid):
+                self._out[tid] = when
+                due.append(self.targets[tid])
+            else:
+                # Another shard's: look again after its interval (in case the ring changes)
+                self._next[tid] = now + self._interval(tid)
+                later.append((self._next[tid], tid))
+        for entry in later:
+            heapq.heappush(self._heap, entry)
+        return due
+
+    def ran(self, tids: Iterable[str], now: float) -> None:
+        ran = {tid: now + self._interval(tid) for tid in tids if tid in self.targets}
+        for tid, when in ran.items():
+            self._next[tid] = when
+            self._out.pop(tid, None)
+            heapq.heappush(self._heap, (when, tid))
+        if not ran:
+            return
+        # One short append per cycle; other shard workers append to the same journal
+        ensure_dir(os.path.dirname(self.path) or ".")
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(ran) + "\n")
 
-    for target in cfg.get("targets", []):
-        tid = target["id"]
-        kind = target["kind"]
-        title = target.get("title", tid)
-        max_items = int(target.get("max_items", 20))
 
+# -----------------------
+# Sharding (--shard-dir)
+# -----------------------
+
+class ShardRing:
+    """Splits targets over the live workers by consistent hashing of the target id.
+
+    Every worker writes a heartbeat file (<worker id>.json) into a shared directory; workers
+    whose file is younger than ttl_sec are members. Each member gets `vnodes` points on a hash
+    ring and owns the ids that hash up to its points, so a join or leave only moves about 1/N
+    of the targets. Membership is re-read every heartbeat_sec, which is how rebalancing happens.
+    """
+
+    def __init__(self, vnodes: int = 64, heartbeat_sec: float = 30.0, ttl_sec: float = 90.0):
+        self.vnodes = vnodes
+        self.heartbeat_sec = heartbeat_sec
+        self.ttl_sec = ttl_sec
+        self.path = ""
+        self.worker_id = ""
+        self._lock = threading.Lock()
+        self._members: Tuple[str, ...] = ()
+        self._points: List[int] = []
+        self._owners: List[str] = []
+        self._refreshed = 0.0
+
+    def configure(self, shard_cfg: Dict[str, Any], path: str, worker_id: Optional[str] = None) -> None:
+        self.vnodes = max(1, int(shard_cfg.get("vnodes", self.vnodes)))
+        self.heartbeat_sec = float(shard_cfg.get("heartbeat_sec", self.heartbeat_sec))
+        self.ttl_sec = float(shard_cfg.get("ttl_sec", self.ttl_sec))
+        self.path = path
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        ensure_dir(path)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int(sha1(key)[:16], 16)
+
+    def _heartbeat_file(self, worker_id: str) -> str:
+        return os.path.join(self.path, f"{quote(worker_id, safe='')}.json")
+
+    def heartbeat(self) -> None:
+        p = self._heartbeat_file(self.worker_id)
+        with open(p + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"worker": self.worker_id, "host": socket.gethostname(), "pid": os.getpid(), "at": now_jst_str()}, f)
+        os.replace(p + ".tmp", p)
+
+    def leave(self) -> None:
         try:
-            if kind == "rss":
-                items = fetch_rss(target["url"], max_items)
-            elif kind == "egov_law_updates":
-                items = fetch_egov_updates(max_items)
-            elif kind == "jgrants":
-                items = fetch_jgrants(
-                    keywords=target.get("keywords", []),
-                    acceptance=str(target.get("acceptance", "1")),
-                    sort=str(target.get("sort", "acceptance_end_datetime")),
-                    order=str(target.get("order", "ASC")),
-                    max_items=max_items,
-                )
-            else:
-                print(f"  - {tid}: unknown kind={kind} (skip)")
+            os.remove(self._heartbeat_file(self.worker_id))
+        except OSError:
+            pass
+
+    def members(self) -> Tuple[str, ...]:
+        cutoff = time.time() - self.ttl_sec
+        live = {self.worker_id}
+        for name in os.listdir(self.path):
+            if not name.endswith(".json"):
                 continue
+            try:
+                if os.stat(os.path.join(self.path, name)).st_mtime >= cutoff:
+                    live.add(unquote(name[:-5]))
+            except OSError:
+                pass  # removed by a leaving worker
+        return tuple(sorted(live))
+
+    def refresh(self, force: bool = False) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._points and now - self._refreshed < self.heartbeat_sec:
+                return
+            self._refreshed = now
+            self.heartbeat()
+            members = self.members()
+            if members == self._members:
+                return
+            ring = sorted((self._hash(f"{m}#{i}"), m) for m in members for i in range(self.vnodes))
+            self._points = [p for p, _ in ring]
+            self._owners = [m for _, m in ring]
+            self._members = members
+        log(f"[{now_jst_str()}] shard: {len(members)} worker(s) {', '.join(members)}; this is {self.worker_id}")
+
+    def owner(self, tid: str) -> str:
+        self.refresh()
+        i = bisect.bisect(self._points, self._hash(tid)) % len(self._points)
+        return self._owners[i]
+
+    def owns(self, tid: str) -> bool:
+        return not self.enabled or self.owner(tid) == self.worker_id
+
+
+SHARDS = ShardRing()
 
-            st = load_state(tid)
-            seen = set(st.get("seen_ids", []))
 
-            new_items = [it for it in items if it["id"] not in seen]
+# -----------------------
+# Core
+# -----------------------
 
-            if not new_items:
-                print(f"  - {tid}: no changes")
-                continue
+FetchFn = Callable[[Dict[str, Any], Dict[str, Any]], Optional[List[Dict[str, Any]]]]
+
+
+class FetcherRegistry:
+    """target kind -> fetcher(target, state) returning items (or None for "not handled").
+
+    Built-in kinds are registered below; other kinds come from installed distributions that
+    declare an entry point in the "notify_hub.fetchers" group (name = kind, object = fetcher).
+    Entry points are only scanned, and a plugin only imported, the first time an unknown kind
+    is asked for. A fetcher may carry a `host(target)` attribute for per-host limits.
+    """
+
+    def __init__(self, group: str = "notify_hub.fetchers"):
+        self.group = group
+        self._fetchers: Dict[str, FetchFn] = {}
+        self._hosts: Dict[str, Callable[[Dict[str, Any]], str]] = {}
+        self._plugins: Optional[Dict[str, Any]] = None  # kind -> entry point, once scanned
+        self._lock = threading.Lock()
+
+    def register(self, kind: str, host: Optional[Callable[[Dict[str, Any]], str]] = None) -> Callable[[FetchFn], FetchFn]:
+        def deco(fn: FetchFn) -> FetchFn:
+            self._fetchers[kind] = fn
+            if host is not None:
+                self._hosts[kind] = host
+            return fn
+        return deco
+
+    def get(self, kind: str) -> Optional[FetchFn]:
+        fn = self._fetchers.get(kind)
+        if fn is not None:
+            return fn
+        with self._lock:
+            if self._plugins is None:
+                from importlib.metadata import entry_points
+                self._plugins = {ep.name: ep for ep in entry_points(group=self.group)}
+            ep = self._plugins.pop(kind, None)
+            if ep is not None:
+                try:
+                    self._fetchers[kind] = ep.load()
+                except Exception as e:
+                    log(f"  fetcher plugin '{kind}' ({ep.value}) failed to load: {safe_text(e) or type(e).__name__}")
+            return self._fetchers.get(kind)
+
+    def host(self, target: Dict[str, Any]) -> str:
+        kind = str(target.get("kind", ""))
+        host_fn = self._hosts.get(kind) or getattr(self.get(kind), "host", None)
+        return host_fn(target) if host_fn else urlparse(target.get("url", "")).netloc
+
+
+FETCHERS = FetcherRegistry()
+
+
+@FETCHERS.register("rss")
+def _rss_target(target: Dict[str, Any], st: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return fetch_rss(
+        target["url"],
+        int(target.get("max_items", 20)),
+        st,
+        max_bytes=target.get("max_body_bytes"),
+        # A revision to an older entry sits below the first unchanged one: detecting updates
+        # means scanning up to max_items, unless the target opts back into the early stop
+        early_stop=bool(target.get("early_stop", not target.get("detect_updates", True))),
+        body_hash=bool(target.get("body_hash", True)),
+    )
+
+
+@FETCHERS.register("egov_law_updates", host=lambda target: urlparse(EGOV_UPDATES_URL).netloc)
+def _egov_target(target: Dict[str, Any], st: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return fetch_egov_updates(
+        int(target.get("max_items", 20)),
+        st,
+        body_hash=bool(target.get("body_hash", True)),
+        catch_up=bool(target.get("catch_up", False)),
+        catch_up_max_days=int(target.get("catch_up_max_days", 7)),
+    )
+
+
+@FETCHERS.register("jgrants", host=lambda target: urlparse(JGRANTS_SUBSIDIES_URL).netloc)
+def _jgrants_target(target: Dict[str, Any], st: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return fetch_jgrants(
+        keywords=target.get("keywords", []),
+        acceptance=str(target.get("acceptance", "1")),
+        sort=str(target.get("sort", "acceptance_end_datetime")),
+        order=str(target.get("order", "ASC")),
+        max_items=int(target.get("max_items", 20)),
+        concurrency=int(target.get("keyword_concurrency", 4)),
+    )
+
+
+def fetch_items(target: Dict[str, Any], st: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    fetch = FETCHERS.get(target["kind"])
+    return fetch(target, st) if fetch is not None else None
+
+
+def target_host(target: Dict[str, Any]) -> str:
+    return FETCHERS.host(target)
+
+
+# target id -> [conditional fetches, 304 responses]
+COND_GET_STATS: Dict[str, List[int]] = {}
+_cond_get_lock = threading.Lock()
+
+
+def record_conditional(tid: str, not_modified: bool) -> None:
+    with _cond_get_lock:
+        c = COND_GET_STATS.setdefault(tid, [0, 0])
+        c[0] += 1
+        c[1] += int(not_modified)
+
+
+def apply_items(target: Dict[str, Any], items: List[Dict[str, Any]], st: Dict[str, Any], dirty: bool = False) -> List[Dict[str, Any]]:
+    # Dedup against state, persist seen ids (+ fingerprints) and return new and updated items,
+    # each tagged with it["change"] = "new" / "updated"
+    seen_ids = st.get("seen_ids", [])
+    seen = set(seen_ids)
+    track = bool(target.get("detect_updates", True))
+    old_fps: Dict[str, str] = st.get("fingerprints", {}) if track else {}
+
+    changed: List[Dict[str, Any]] = []
+    fps: Dict[str, str] = {}
+    for it in items:
+        fp = item_fingerprint(it) if track else ""
+        if it["id"] not in seen:
+            it["change"] = "new"
+            changed.append(it)
+        elif old_fps.get(it["id"], fp) != fp:
+            # Ids seen before fingerprints were kept have nothing to compare against: adopt silently
+            it["change"] = "updated"
+            changed.append(it)
+        fps[it["id"]] = fp
+
+    if changed:
+        # Update state (keep latest 300 ids, newest first: early-stopping fetchers rely on the order)
+        merged = [it["id"] for it in items] + list(seen_ids)
+        st["seen_ids"] = list(dict.fromkeys(merged))[:300]
+        st["last_run"] = now_jst_str()
+    if track:
+        if any(old_fps.get(k) != v for k, v in fps.items()):
+            st["fingerprints"] = {i: fps.get(i) or old_fps[i] for i in st["seen_ids"] if i in fps or i in old_fps}
+            dirty = True
+    elif st.pop("fingerprints", None) is not None:
+        dirty = True
+
+    if changed or dirty:
+        save_state(target["id"], st)
+    return changed
+
+
+class CircuitBreaker:
+    """Per-target breaker settings; the breaker itself lives in the target state under "breaker".
+
+    closed -> open after `failures` consecutive failed fetches; open targets are skipped until
+    the cool-down passes, then one probe fetch (no retries) decides between closed and open again
+    (with the cool-down doubled, up to max_cooldown_sec).
+    """
+
+    def __init__(self, failures: int = 3, cooldown_sec: float = 600.0, max_cooldown_sec: float = 3600.0):
+        self.failures = failures
+        self.cooldown_sec = cooldown_sec
+        self.max_cooldown_sec = max_cooldown_sec
+
+    def configure(self, breaker_cfg: Dict[str, Any]) -> None:
+        self.failures = max(1, int(breaker_cfg.get("failures", self.failures)))
+        self.cooldown_sec = float(breaker_cfg.get("cooldown_sec", self.cooldown_sec))
+        self.max_cooldown_sec = float(breaker_cfg.get("max_cooldown_sec", self.max_cooldown_sec))
+
+    def remaining(self, br: Dict[str, Any]) -> float:
+        # Seconds left of the cool-down; <= 0 means half-open (probe allowed)
+        if br.get("state") != "open":
+            return 0.0
+        return float(br.get("opened_at", 0)) + float(br.get("cooldown_sec", self.cooldown_sec)) - time.time()
+
+    def failed(self, br: Dict[str, Any], probe: bool) -> Dict[str, Any]:
+        failures = int(br.get("failures", 0)) + 1
+        if probe:
+            cooldown = min(self.max_cooldown_sec, float(br.get("cooldown_sec", self.cooldown_sec)) * 2)
+            return {"state": "open", "failures": failures, "opened_at": time.time(), "cooldown_sec": cooldown}
+        if failures >= self.failures:
+            return {"state": "open", "failures": failures, "opened_at": time.time(), "cooldown_sec": self.cooldown_sec}
+        return {"state": "closed", "failures": failures}
+
+
+BREAKER = CircuitBreaker()
+
+
+class LeaseLocks:
+    """Per-target lease files (<state dir>/<id>.lock) so overlapping processes never run a target twice.
+
+    A lease is created with O_CREAT|O_EXCL and records its holder and expiry; one past its expiry
+    (crashed or hung holder) is taken over. A target whose lease is held elsewhere is waited for
+    up to wait_sec, then skipped with status "locked". A finished target keeps its lease until its
+    new state is committed (hold_until_commit); a background thread renews such leases every
+    ttl_sec/3, so a long run never lets another process take over a target before the commit.
+    """
+
+    def __init__(self, enabled: bool = True, ttl_sec: float = 300.0, wait_sec: float = 0.0):
+        self.enabled = enabled
+        self.ttl_sec = ttl_sec
+        self.wait_sec = wait_sec
+        self._lock = threading.Lock()
+        self._stats = {"skipped": 0, "waited": 0, "wait_sec": 0.0, "taken_over": 0}
+        self._kept: Dict[str, str] = {}  # finished targets waiting for the state commit
+        self._renewer: Optional[threading.Thread] = None
+
+    def configure(self, lease_cfg: Dict[str, Any]) -> None:
+        self.enabled = bool(lease_cfg.get("enabled", self.enabled))
+        self.ttl_sec = float(lease_cfg.get("ttl_sec", self.ttl_sec))
+        self.wait_sec = float(lease_cfg.get("wait_sec", self.wait_sec))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats)
+
+    def _count(self, key: str, amount: float = 1) -> None:
+        with self._lock:
+            self._stats[key] += amount
+
+    @staticmethod
+    def _read(path: str) -> Dict[str, Any]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _record(token: str, hold_sec: float) -> Dict[str, Any]:
+        return {"token": token, "owner": f"{socket.gethostname()}:{os.getpid()}", "expires": time.time() + hold_sec}
 
-            # Update state (keep latest 300 ids)
-            merged = [it["id"] for it in items] + list(seen)
-            dedup = []
-            for x in merged:
-                if x not in dedup:
-                    dedup.append(x)
-            st["seen_ids"] = dedup[:300]
-            st["last_run"] = now_jst_str()
+    def _create(self, path: str, hold_sec: float) -> Optional[str]:
+        token = os.urandom(8).hex()
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            return None
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self._record(token, hold_sec), f)
+        return token
+
+    def _take_over(self, tid: str, path: str) -> bool:
+        # Remove an expired lease; True when the caller should try to create its own again
+        held = self._read(path)
+        try:
+            # A lease file that cannot be read yet is being written, or its holder died mid-write
+            expires = float(held.get("expires") or os.stat(path).st_mtime + self.ttl_sec)
+        except OSError:
+            return True
+        if expires > time.time():
+            return False
+        stale = f"{path}.{os.getpid()}.{threading.get_ident()}.stale"
+        try:
+            os.rename(path, stale)  # only one contender can move a given file
+        except FileNotFoundError:
+            return True
+        if self._read(stale).get("token") != held.get("token"):
+            # Lost a race and moved a fresh lease: put it back
+            try:
+                os.link(stale, path)
+            except OSError:
+                pass
+            os.remove(stale)
+            return False
+        os.remove(stale)
+        log(f"  - {tid}: lease of {held.get('owner', '?')} expired, taking over")
+        self._count("taken_over")
+        return True
+
+    def acquire(self, tid: str, hold_sec: float) -> Optional[str]:
+        """Lease token, "" when leases are disabled, or None when the target is held elsewhere."""
+        if not self.enabled:
+            return ""
+        ensure_dir(state_dir())
+        path = os.path.join(state_dir(), f"{tid}.lock")
+        started = time.monotonic()
+        contended = False
+        while True:
+            token = self._create(path, max(self.ttl_sec, hold_sec))
+            if token is not None:
+                if contended:
+                    self._count("waited")
+                    self._count("wait_sec", time.monotonic() - started)
+                return token
+            if self._take_over(tid, path):
+                continue
+            contended = True
+            left = self.wait_sec - (time.monotonic() - started)
+            if left <= 0:
+                self._count("skipped")
+                return None
+            time.sleep(min(0.2, left))
+
+    def _renew(self, tid: str, token: str) -> None:
+        # Caller holds self._lock, so a concurrent release cannot be undone by the rewrite
+        path = os.path.join(state_dir(), f"{tid}.lock")
+        if self._read(path).get("token") != token:
+            log(f"  - {tid}: lease lost before the state was committed")
+            return
+        tmp = f"{path}.{os.getpid()}.renew"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._record(token, self.ttl_sec), f)
+        os.replace(tmp, path)
+
+    def _renew_loop(self) -> None:
+        while True:
+            time.sleep(max(1.0, self.ttl_sec / 3))
+            with self._lock:
+                if not self._kept:
+                    self._renewer = None
+                    return
+                for tid, token in self._kept.items():
+                    self._renew(tid, token)
+
+    def hold_until_commit(self, tid: str, token: Optional[str]) -> None:
+        """Release the lease once STATE has committed the target's new state, renewing it meanwhile."""
+        if token:
+            with self._lock:
+                self._kept[tid] = token
+                self._renew(tid, token)  # the acquire-time expiry may be nearly used up
+                if self._renewer is None:
+                    self._renewer = threading.Thread(target=self._renew_loop, name="lease-renew", daemon=True)
+                    self._renewer.start()
+        STATE.after_commit(functools.partial(self.release, tid, token))
+
+    def release(self, tid: str, token: Optional[str]) -> None:
+        if not token:
+            return
+        path = os.path.join(state_dir(), f"{tid}.lock")
+        with self._lock:
+            self._kept.pop(tid, None)
+            if self._read(path).get("token") == token:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+LEASES = LeaseLocks()
+
+
+def conditional_sent(before: Optional[Dict[str, Any]], st: Dict[str, Any], fetch: Optional[FetchFn]) -> bool:
+    # Validators from before the fetch went out only if they belong to the URL that was fetched
+    # (the e-Gov URL changes daily) and the request was a live poll (not a push, record or replay)
+    if fetch is not None or HTTP_ARCHIVE.mode or not before:
+        return False
+    after = st.get("validators") or {}
+    return not after or bool(set(before) & set(after))
+
+
+def collect_changes(target: Dict[str, Any], fetch: Optional[FetchFn] = None) -> Tuple[str, List[Dict[str, Any]]]:
+    """Blocking fetch + dedup + state phase shared by both engines; returns (status, new items).
+
+    `fetch` replaces the polling fetcher (WebSub pushes); the circuit breaker only guards polling.
+    """
+    tid = target["id"]
+    st = load_state(tid)
+    fetch_keys_before = [st.get(k) for k in FETCH_STATE_KEYS]
+
+    br = (st.get("breaker") or {}) if fetch is None else {}
+    wait = BREAKER.remaining(br)
+    if wait > 0:
+        log(f"  - {tid}: circuit open (retry in {int(wait)}s)")
+        return "circuit_open", []
+    probe = br.get("state") == "open"
+    if probe:
+        log(f"  - {tid}: circuit half-open, probing")
+
+    loaded = dict(st)
+    token = _probe.set(probe)
+    try:
+        items = (fetch or fetch_items)(target, st)
+    except NotModified as e:
+        # Nothing changed upstream (304, or same body bytes): skip dedup and scoring
+        if isinstance(e, BodyUnchanged):
+            if conditional_sent(fetch_keys_before[0], st, fetch):
+                record_conditional(tid, False)
+            log(f"  - {tid}: unchanged body (hash match)")
+            status = "unchanged"
+        else:
+            record_conditional(tid, True)
+            log(f"  - {tid}: not modified (304)")
+            status = "not_modified"
+        # Keep what the fetcher refreshed on the way (rotated validators, hub links, catch-up date)
+        if br or [st.get(k) for k in FETCH_STATE_KEYS] != fetch_keys_before:
+            st.pop("breaker", None)
             save_state(tid, st)
+        return status, []
+    except Exception:
+        if fetch is not None:
+            raise
+        # Persist the failure on top of the state as loaded (the fetcher may have touched validators)
+        loaded["breaker"] = BREAKER.failed(br, probe)
+        save_state(tid, loaded)
+        if loaded["breaker"]["state"] == "open":
+            note(f"circuit opened for {int(loaded['breaker']['cooldown_sec'])}s after {loaded['breaker']['failures']} failure(s)")
+        raise
+    finally:
+        _probe.reset(token)
+
+    if br:
+        st.pop("breaker", None)
+
+    if items is None:
+        log(f"  - {tid}: unknown kind={target['kind']} (skip)")
+        return "skipped", []
+
+    if conditional_sent(fetch_keys_before[0], st, fetch):
+        record_conditional(tid, False)
+
+    dirty = bool(br) or [st.get(k) for k in FETCH_STATE_KEYS] != fetch_keys_before
+    new_items = apply_items(target, items, st, dirty=dirty)
+    if not new_items:
+        log(f"  - {tid}: no changes")
+        return "no_changes", []
+    return "ok", new_items
+
+
+def build_notifications(target: Dict[str, Any], new_items: List[Dict[str, Any]]) -> List[Tuple[str, str, str]]:
+    # (headline, body, url) per message: send up to 3 items, summarize rest
+    title = target.get("title", target["id"])
+    messages: List[Tuple[str, str, str]] = []
+    for it in new_items[:3]:
+        level, ai_comment = importance_level(it, target)
+        if it.get("change") == "updated":
+            headline = f"✏️ 内容変更 [{title}]（重要度:{level}）"
+        else:
+            headline = f"🚨 更新検知 [{title}]（重要度:{level}）"
+        body = f"{ai_comment}\n・タイトル: {safe_text(it.get('title'))}\n・概要: {safe_text(it.get('summary'))}\n・日時: {safe_text(it.get('published'))}\n・ソース: {safe_text(it.get('source'))}"
+        messages.append((headline, body, safe_text(it.get("url"))))
+
+    if len(new_items) > 3:
+        headline = f"📌 追加更新 [{title}]"
+        body = f"他 {len(new_items)-3} 件の新規/更新がありました。必要なら max_items を上げて追跡できます。"
+        messages.append((headline, body, "（リンクは各通知参照）"))
+    return messages
+
+
+def error_notification(target: Dict[str, Any], msg: str) -> Tuple[str, str, str]:
+    # Error notification (keeps readable, avoids mojibake)
+    headline = f"⚠️ 取得失敗 [{target.get('title', target['id'])}]"
+    body = f"時刻: {now_jst_str()}\n種別: {target['kind']}\nエラー: {msg}\n対処: URL/パラメータ/ネットワークを確認"
+    return headline, body, target.get("url", "")
+
+
+def new_result(target: Dict[str, Any]) -> Dict[str, Any]:
+    return {"id": target["id"], "status": "ok", "new": 0, "updated": 0, "elapsed": 0.0, "error": "", "notes": []}
+
+
+def process_target(cfg: Dict[str, Any], target: Dict[str, Any], timeout_sec: float, fetch: Optional[FetchFn] = None) -> Dict[str, Any]:
+    """Fetch, update state and notify for a single target; returns a summary row."""
+    tid = target["id"]
+    result = new_result(target)
+    timeout = float(target.get("timeout_sec", timeout_sec))
+
+    started = time.monotonic()
+    lease = LEASES.acquire(tid, timeout + 60)
+    if lease is None:
+        log(f"  - {tid}: being processed by another run (skip)")
+        result["status"] = "locked"
+        return result
+    token = _deadline.set(started + timeout)
+    notes_token = _notes.set(result["notes"])
+    try:
+        result["status"], new_items = collect_changes(target, fetch)
+        if not new_items:
+            return result
+
+        for headline, body, url in build_notifications(target, new_items):
+            notify_all(cfg, headline, body, url)
+
+        log(f"  - {tid}: notified {len(new_items)} change(s)")
+        result["new"] = len(new_items)
+        result["updated"] = sum(1 for it in new_items if it.get("change") == "updated")
+
+    except Exception as e:
+        msg = safe_text(e) or type(e).__name__
+        try:
+            notify_all(cfg, *error_notification(target, msg))
+        except Exception as ne:
+            log(f"  - {tid}: error notification failed: {safe_text(ne)}")
+        log(f"  - {tid}: ERROR {msg}")
+        result["status"] = "timeout" if isinstance(e, DeadlineExceeded) else "error"
+        result["error"] = msg
+
+    finally:
+        LEASES.hold_until_commit(tid, lease)
+        _deadline.reset(token)
+        _notes.reset(notes_token)
+        result["elapsed"] = time.monotonic() - started
+
+    return result
+
+
+def print_summary(results: List[Dict[str, Any]], wall: float) -> None:
+    counts: Dict[str, int] = {}
+    for r in results:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    breakdown = ", ".join(f"{k}={v}" for k, v in sorted(counts.items()))
+    print(f"  summary: {len(results)} target(s) in {wall:.2f}s ({breakdown})")
+    for r in results:
+        extra = f" new={r['new'] - r['updated']}" if r["new"] > r["updated"] else ""
+        if r["updated"]:
+            extra += f" updated={r['updated']}"
+        cond = COND_GET_STATS.get(r["id"])
+        if cond:
+            extra += f" 304={cond[1]}/{cond[0]} ({cond[1] * 100 // cond[0]}%)"
+        print(f"    {r['id']:<28} {r['status']:<12} {r['elapsed']:6.2f}s{extra}")
+        for n in r.get("notes", []):
+            print(f"      ! {n}")
+    hs = SESSIONS.stats()
+    print(f"  http: {hs['requests']} request(s), {hs['opened']} new connection(s), {hs['reused']} reused")
+    for host, (waited, queued) in sorted(RATE_LIMITS.waits().items()):
+        print(f"  rate limit: {host} waited {waited:.2f}s over {queued} request(s)")
+    js = JGRANTS_CACHE.stats()
+    if js["hits"] or js["misses"]:
+        print(f"  jgrants cache: {js['hits']} hit(s), {js['misses']} miss(es), {js['size']} entr(y/ies)")
+    ls = LEASES.stats()
+    if ls["skipped"] or ls["waited"] or ls["taken_over"]:
+        print(f"  leases: {ls['skipped']} skipped (held by another run), {ls['waited']} waited {ls['wait_sec']:.2f}s, {ls['taken_over']} expired taken over")
+    if HTTP_ARCHIVE.replaying:
+        print(f"  replay: {HTTP_ARCHIVE.served} response(s) from {HTTP_ARCHIVE.path}, {HTTP_ARCHIVE.stubbed_posts} webhook post(s) stubbed")
+
+
+def select_targets(cfg: Dict[str, Any], store: Optional[TargetStore]) -> List[Dict[str, Any]]:
+    targets = cfg.get("targets", []) or []
+    if SHARDS.enabled:
+        SHARDS.refresh(force=True)
+    if store is not None:
+        due = store.due(time.time(), SHARDS.owns)
+        log(f"  {len(due)}/{len(targets)} target(s) due")
+        return due
+    if SHARDS.enabled:
+        mine = [t for t in targets if SHARDS.owns(t["id"])]
+        log(f"  shard {SHARDS.worker_id}: {len(mine)}/{len(targets)} target(s)")
+        targets = mine
+    return targets
+
+
+def run_once(cfg: Dict[str, Any], store: Optional[TargetStore] = None) -> List[Dict[str, Any]]:
+    print(f"[{now_jst_str()}] run_once start")
+
+    run_cfg = cfg.get("run", {}) or {}
+    max_workers = max(1, int(run_cfg.get("max_workers", 4)))
+    timeout_sec = float(run_cfg.get("target_timeout_sec", 120))
+    targets = select_targets(cfg, store)
+
+    SESSIONS.reap_idle()
+    started = time.monotonic()
+    results: Dict[str, Dict[str, Any]] = {}
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="target") as pool:
+        futures = {pool.submit(process_target, cfg, t, timeout_sec): t["id"] for t in targets}
+        for fut in as_completed(futures):
+            results[futures[fut]] = fut.result()
+    STATE.flush()  # one transaction for the whole run
+
+    ordered = [results[t["id"]] for t in targets if t["id"] in results]
+    if store is not None:
+        store.ran(results, time.time())
+    print_summary(ordered, time.monotonic() - started)
+    print(f"[{now_jst_str()}] run_once end")
+    return ordered
+
 
-            # Notify (send up to 3 items, summarize rest)
-            top = new_items[:3]
-            for it in top:
-                level, ai_comment = importance_level(it, target)
-                headline = f"🚨 更新検知 [{title}]（重要度:{level}）"
-                body = f"{ai_comment}\n・タイトル: {safe_text(it.get('title'))}\n・概要: {safe_text(it.get('summary'))}\n・日時: {safe_text(it.get('published'))}\n・ソース: {safe_text(it.get('source'))}"
-                notify_all(cfg, headline, body, safe_text(it.get("url")))
+# -----------------------
+# Scheduler (--watch)
+# -----------------------
 
-            if len(new_items) > 3:
-                headline = f"📌 追加更新 [{title}]"
-                body = f"他 {len(new_items)-3} 件の新規/更新がありました。必要なら max_items を上げて追跡できます。"
-                notify_all(cfg, headline, body, "（リンクは各通知参照）")
+_target_locks: Dict[str, threading.Lock] = {}
+_target_locks_guard = threading.Lock()
+
+
+def target_lock(tid: str) -> threading.Lock:
+    # Serializes polls and pushes for the same target within this process
+    with _target_locks_guard:
+        return _target_locks.setdefault(tid, threading.Lock())
+
+
+def phase_offset(tid: str, interval: float) -> float:
+    # Deterministic start offset in [0, interval) from the target id, so targets spread evenly
+    return int(sha1(tid)[:8], 16) / 0x100000000 * interval
+
+
+class AdaptivePolicy:
+    """Learns a polling interval per target from the gaps between observed changes.
+
+    After a change the interval is tightened (half the current interval or half the typical
+    gap, whichever is shorter); every quiet poll multiplies it by `backoff`. Always within
+    [min_sec, max_sec]. Gaps and the learned interval are kept in the target state under "adaptive".
+    """
+
+    def __init__(self, enabled: bool = False, min_sec: float = 60.0, max_sec: float = 3600.0, backoff: float = 1.5, history: int = 8):
+        self.enabled = enabled
+        self.min_sec = min_sec
+        self.max_sec = max_sec
+        self.backoff = backoff
+        self.history = history
+
+    def configure(self, adaptive_cfg: Dict[str, Any]) -> None:
+        self.enabled = bool(adaptive_cfg.get("enabled", self.enabled))
+        self.min_sec = float(adaptive_cfg.get("min_sec", self.min_sec))
+        self.max_sec = max(self.min_sec, float(adaptive_cfg.get("max_sec", self.max_sec)))
+        self.backoff = max(1.0, float(adaptive_cfg.get("backoff", self.backoff)))
+        self.history = max(1, int(adaptive_cfg.get("history", self.history)))
+
+    def applies(self, target: Dict[str, Any]) -> bool:
+        return bool(target.get("adaptive", self.enabled))
+
+    def clamp(self, interval: float) -> float:
+        return min(self.max_sec, max(self.min_sec, interval))
+
+    def on_change(self, adaptive: Dict[str, Any], interval: float, now: float) -> Dict[str, Any]:
+        gaps = list(adaptive.get("gaps", []))
+        if adaptive.get("last_change"):
+            gaps = (gaps + [round(now - float(adaptive["last_change"]), 1)])[-self.history:]
+        typical = sorted(gaps)[len(gaps) // 2] if gaps else interval
+        return {"interval_sec": self.clamp(min(interval, typical) / 2), "last_change": now, "gaps": gaps}
+
+    def on_quiet(self, interval: float) -> float:
+        return self.clamp(interval * self.backoff)
+
+
+ADAPTIVE = AdaptivePolicy()
+
+
+class Scheduler:
+    """Min-heap of next-due times; each target runs at its own fixed rate.
+
+    A target's next slot is its previous due time plus its interval (not "finished + interval"),
+    so run time does not accumulate as drift. Slots that were missed while a run overran are
+    dropped, and a target whose previous run is still in flight is skipped for that slot.
+    Adaptive targets change their interval after each run and are rescheduled accordingly.
+    """
+
+    def __init__(self, cfg: Dict[str, Any], default_interval: float, websub: Optional["WebSubReceiver"] = None):
+        run_cfg = cfg.get("run", {}) or {}
+        self.cfg = cfg
+        self.default_interval = default_interval
+        self.websub = websub
+        self.spread = bool((cfg.get("watch", {}) or {}).get("spread", False))
+        self.timeout_sec = float(run_cfg.get("target_timeout_sec", 120))
+        self.max_workers = max(1, int(run_cfg.get("max_workers", 4)))
+        self.targets = {t["id"]: t for t in cfg.get("targets", []) or []}
+        self._lock = threading.Lock()
+        self._heap: List[Tuple[float, int, str]] = []
+        self._due: Dict[str, float] = {}  # live entry per target; anything else in the heap is stale
+        self._slot: Dict[str, float] = {}  # due time of the most recent run
+        self._seq: Dict[str, int] = {tid: i for i, tid in enumerate(self.targets)}
+        self._interval: Dict[str, float] = {}
+        self._inflight: Dict[str, Any] = {}
+
+        for tid, t in self.targets.items():
+            interval = float(t.get("interval_sec", default_interval))
+            if ADAPTIVE.applies(t):
+                interval = ADAPTIVE.clamp(float((load_state(tid).get("adaptive") or {}).get("interval_sec", interval)))
+            self._interval[tid] = max(1.0, interval)
+
+    def _push(self, tid: str, due: float) -> None:
+        self._due[tid] = due
+        heapq.heappush(self._heap, (due, self._seq[tid], tid))
+
+    def next_due(self, tid: str, due: float, now: float) -> float:
+        interval = self._interval[tid]
+        nxt = due + interval
+        if nxt <= now:
+            missed = int((now - nxt) // interval) + 1
+            log(f"  - {tid}: behind schedule, skipping {missed} slot(s)")
+            nxt += missed * interval
+        return nxt
+
+    def _run(self, tid: str) -> Dict[str, Any]:
+        target = self.targets[tid]
+        with target_lock(tid):
+            result = process_target(self.cfg, target, self.timeout_sec)
+            STATE.flush()
+        if self.websub is not None:
+            self.websub.maintain(target)
+        if not ADAPTIVE.applies(target):
+            return result
+
+        current = self._interval[tid]
+        if result["new"]:
+            st = load_state(tid)
+            st["adaptive"] = ADAPTIVE.on_change(st.get("adaptive") or {}, current, time.time())
+            save_state(tid, st)
+            STATE.flush()
+            interval = st["adaptive"]["interval_sec"]
+        elif result["status"] in ("no_changes", "not_modified", "unchanged"):
+            interval = ADAPTIVE.on_quiet(current)
+        else:
+            interval = current
+
+        with self._lock:
+            self._interval[tid] = interval
+            due = max(time.monotonic(), self._slot[tid] + interval)
+            if due != self._due.get(tid):
+                self._push(tid, due)
+        log(f"  - {tid}: effective interval {interval:.0f}s (adaptive)")
+        return result
+
+    def run_forever(self) -> None:
+        start = time.monotonic()
+        with self._lock:
+            for tid in self.targets:
+                self._push(tid, start + (phase_offset(tid, self._interval[tid]) if self.spread else 0.0))
+        log(f"[{now_jst_str()}] scheduler start: {len(self.targets)} target(s), {self.max_workers} worker(s)")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="target") as pool:
+            while True:
+                with self._lock:
+                    if not self._heap:
+                        break
+                    due, _, tid = self._heap[0]
+                    now = time.monotonic()
+                    if due <= now:
+                        heapq.heappop(self._heap)
+                if due > now:
+                    if SHARDS.enabled:
+                        SHARDS.refresh()  # keep heartbeating while idle
+                    time.sleep(min(due - now, 1.0))
+                    continue
+                if self._due.get(tid) != due:
+                    continue  # superseded by a reschedule
+
+                running = self._inflight.get(tid)
+                if not SHARDS.owns(tid):
+                    pass  # another worker's target for now; stays scheduled in case the ring changes
+                elif running is not None and not running.done():
+                    log(f"  - {tid}: previous run still in flight (skip)")
+                elif self.websub is not None and self.websub.leased(tid):
+                    # Pushed by the hub while the lease holds; polling resumes once it lapses
+                    log(f"  - {tid}: websub lease active (poll skipped)")
+                    self._inflight[tid] = pool.submit(self.websub.maintain, self.targets[tid])
+                else:
+                    SESSIONS.reap_idle()
+                    self._slot[tid] = due
+                    self._inflight[tid] = pool.submit(self._run, tid)
+
+                with self._lock:
+                    self._push(tid, self.next_due(tid, due, now))
 
-            print(f"  - {tid}: notified {len(new_items)} change(s)")
 
+# -----------------------
+# WebSub (push)
+# -----------------------
+
+class WebSubReceiver:
+    """WebSub (PubSubHubbub) subscriber for rss targets whose feed advertises a hub.
+
+    Runs a callback endpoint at websub.callback_url/<target id>, subscribes to the hub found
+    by discover_hub(), and feeds pushed content through the same dedup/importance/notify path
+    as a poll. While a verified lease holds the target is not polled; when it lapses polling
+    takes over again and the subscription is renewed.
+    """
+
+    def __init__(self, cfg: Dict[str, Any]):
+        ws = cfg.get("websub", {}) or {}
+        self.cfg = cfg
+        self.listen = (str(ws.get("listen_host", "0.0.0.0")), int(ws.get("listen_port", 8088)))
+        self.callback_url = str(ws.get("callback_url", "")).rstrip("/")
+        self.lease_seconds = int(ws.get("lease_seconds", 86400))
+        self.renew_before_sec = float(ws.get("renew_before_sec", 3600))
+        self.secret = str(ws.get("secret") or "")
+        self.timeout_sec = float((cfg.get("run", {}) or {}).get("target_timeout_sec", 120))
+        self.targets = {t["id"]: t for t in cfg.get("targets", []) or [] if t.get("kind") == "rss" and t.get("websub", True)}
+        self._lock = threading.Lock()
+        self._subs: Dict[str, Dict[str, Any]] = {}  # tid -> hub, topic, state (pending/active), requested, awaiting, expires
+        self._server: Optional[Any] = None  # http.server.ThreadingHTTPServer
+
+    def start(self) -> None:
+        from http.server import ThreadingHTTPServer
+
+        if not self.secret:
+            raise ValueError("websub.secret is required: unsigned pushes would be notified as-is")
+
+        self._server = ThreadingHTTPServer(self.listen, self._handler())
+        threading.Thread(target=self._server.serve_forever, name="websub", daemon=True).start()
+        log(f"[{now_jst_str()}] websub: listening on {self.listen[0]}:{self._server.server_port}, callback {self.callback_url}/<id>")
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def leased(self, tid: str) -> bool:
+        with self._lock:
+            sub = self._subs.get(tid)
+            return bool(sub) and sub["state"] == "active" and sub["expires"] > time.time()
+
+    def maintain(self, target: Dict[str, Any]) -> None:
+        # Subscribe (or renew) when the feed has a hub and we hold no lease that is good for a while
+        tid = target["id"]
+        if tid not in self.targets:
+            return
+        hub = load_state(tid).get("websub_hub") or {}
+        if not hub:
+            return
+        now = time.time()
+        with self._lock:
+            sub = self._subs.get(tid)
+            if sub and sub["hub"] == hub["hub"]:
+                if sub["state"] == "active" and sub["expires"] - now > self.renew_before_sec:
+                    return
+                if sub["state"] == "pending" and now - sub["requested"] < 300:
+                    return
+            self._subs[tid] = {
+                "hub": hub["hub"],
+                "topic": hub["topic"],
+                "state": sub["state"] if sub else "pending",
+                "requested": now,
+                "awaiting": True,  # one intent verification is accepted per subscribe request
+                "expires": sub["expires"] if sub else 0.0,
+            }
+
+        data = {
+            "hub.mode": "subscribe",
+            "hub.topic": hub["topic"],
+            "hub.callback": f"{self.callback_url}/{quote(tid, safe='')}",
+            "hub.lease_seconds": str(self.lease_seconds),
+        }
+        data["hub.secret"] = self.secret
+        try:
+            SESSIONS.session(hub["hub"]).post(hub["hub"], data=data, timeout=20).raise_for_status()
+            log(f"  - {tid}: websub subscribe requested at {hub['hub']}")
         except Exception as e:
-            # Error notification (keeps readable, avoids mojibake)
-            msg = safe_text(e)
-            headline = f"⚠️ 取得失敗 [{title}]"
-            body = f"時刻: {now_jst_str()}\n種別: {kind}\nエラー: {msg}\n対処: URL/パラメータ/ネットワークを確認"
-            notify_all(cfg, headline, body, target.get("url", ""))
-            print(f"  - {tid}: ERROR {msg}")
+            log(f"  - {tid}: websub subscribe failed: {safe_text(e)}")
+
+    def verify(self, tid: str, query: Dict[str, str]) -> Optional[str]:
+        # Intent verification from the hub: echo the challenge only for a subscribe request we
+        # have just sent (anyone can GET the callback with the public topic URL), and never grant
+        # a longer lease than we asked for. We never unsubscribe, so such requests are refused.
+        mode = query.get("hub.mode", "")
+        with self._lock:
+            sub = self._subs.get(tid)
+            if mode == "denied":
+                self._subs.pop(tid, None)
+                log(f"  - {tid}: websub subscription denied ({query.get('hub.reason', '')})")
+                return ""
+            if not sub or query.get("hub.topic") != sub["topic"] or not query.get("hub.challenge"):
+                return None
+            if mode != "subscribe" or not sub["awaiting"]:
+                return None
+            lease = query.get("hub.lease_seconds", "")
+            sub["state"] = "active"
+            sub["awaiting"] = False
+            sub["expires"] = time.time() + min(int(lease) if lease.isdigit() else self.lease_seconds, self.lease_seconds)
+            log(f"  - {tid}: websub lease active for {int(sub['expires'] - time.time())}s")
+        return query["hub.challenge"]
+
+    def receive(self, tid: str, body: bytes, headers: Any) -> None:
+        target = self.targets.get(tid)
+        with self._lock:
+            known = tid in self._subs
+        if target is None or not known:
+            return
+        # Pushed content goes straight into notifications: only accept what the hub signed
+        if not self.secret:
+            log(f"  - {tid}: websub push ignored (websub.secret is not set)")
+            return
+        algo, _, sig = (headers.get("X-Hub-Signature") or "").partition("=")
+        if algo not in ("sha1", "sha256", "sha384", "sha512"):
+            log(f"  - {tid}: websub push without a valid signature (ignored)")
+            return
+        expected = hmac.new(self.secret.encode("utf-8"), body, algo).hexdigest()
+        if not hmac.compare_digest(expected, sig.strip()):
+            log(f"  - {tid}: websub push signature mismatch (ignored)")
+            return
+
+        content_type = headers.get("Content-Type", "")
+
+        def pushed(t: Dict[str, Any], st: Dict[str, Any]) -> List[Dict[str, Any]]:
+            return parse_feed_body(bytearray(body), t["url"], content_type, int(t.get("max_items", 20)))
+
+        log(f"  - {tid}: websub push ({len(body)} bytes)")
+        with target_lock(tid):
+            process_target(self.cfg, target, self.timeout_sec, fetch=pushed)
+            STATE.flush()
+
+    def _handler(self) -> type:
+        from http.server import BaseHTTPRequestHandler
+
+        receiver = self
+        prefix = urlparse(self.callback_url).path.rstrip("/") + "/"
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def _tid(self) -> str:
+                path = urlparse(self.path).path
+                return unquote(path[len(prefix):]) if path.startswith(prefix) else ""
+
+            def _reply(self, code: int, text: str = "") -> None:
+                data = text.encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", "text/plain; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self) -> None:
+                tid = self._tid()
+                query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+                challenge = receiver.verify(tid, query) if tid else None
+                if challenge is None:
+                    self._reply(404)
+                else:
+                    self._reply(200, challenge)
+
+            def do_POST(self) -> None:
+                tid = self._tid()
+                length = int(self.headers.get("Content-Length") or 0)
+                if not tid or length > SESSIONS.max_body_bytes:
+                    self._reply(404 if not tid else 413)
+                    return
+                body = self.rfile.read(length)
+                # Acknowledge first; the hub should not wait for our notifications
+                self._reply(202)
+                try:
+                    receiver.receive(tid, body, self.headers)
+                except Exception as e:
+                    log(f"  - {tid}: websub push failed: {safe_text(e)}")
+
+        return Handler
+
 
+# -----------------------
+# Async engine (--engine async)
+# -----------------------
+
+class HostSemaphores:
+    """One asyncio.Semaphore per host, created lazily on the running loop."""
+
+    def __init__(self, per_host: int):
+        self.per_host = per_host
+        self._sems: Dict[str, asyncio.Semaphore] = {}
+
+    def get(self, url_or_host: str) -> asyncio.Semaphore:
+        host = urlparse(url_or_host).netloc or url_or_host
+        if host not in self._sems:
+            self._sems[host] = asyncio.Semaphore(self.per_host)
+        return self._sems[host]
+
+
+async def notify_all_async(cfg: Dict[str, Any], sems: HostSemaphores, headline: str, body: str, url: str) -> None:
+    async def send(webhook_url: str, call: Callable[[], None]) -> None:
+        async with sems.get(webhook_url):
+            await asyncio.to_thread(call)
+
+    calls = notifier_calls(cfg, headline, body, url)
+    await asyncio.gather(*(send(w, c) for w, c in calls))
+
+
+async def process_target_async(cfg: Dict[str, Any], target: Dict[str, Any], timeout_sec: float, sems: HostSemaphores) -> Dict[str, Any]:
+    tid = target["id"]
+    result = new_result(target)
+    timeout = float(target.get("timeout_sec", timeout_sec))
+
+    started = time.monotonic()
+    lease = await asyncio.to_thread(LEASES.acquire, tid, timeout + 60)
+    if lease is None:
+        log(f"  - {tid}: being processed by another run (skip)")
+        result["status"] = "locked"
+        return result
+    _notes.set(result["notes"])  # each task runs in its own context copy
+    try:
+        async with sems.get(target_host(target)):
+            # to_thread copies the context, so the blocking fetch sees the deadline too. The
+            # thread is always awaited (no wait_for): it cannot be cancelled, and abandoning it
+            # would let it save new ids as seen after this task had given up on notifying them
+            token = _deadline.set(time.monotonic() + timeout)
+            try:
+                result["status"], new_items = await asyncio.to_thread(collect_changes, target)
+            finally:
+                _deadline.reset(token)
+
+        if not new_items:
+            return result
+
+        for headline, body, url in build_notifications(target, new_items):
+            await notify_all_async(cfg, sems, headline, body, url)
+
+        log(f"  - {tid}: notified {len(new_items)} change(s)")
+        result["new"] = len(new_items)
+        result["updated"] = sum(1 for it in new_items if it.get("change") == "updated")
+
+    except Exception as e:
+        msg = safe_text(e) or type(e).__name__
+        try:
+            await notify_all_async(cfg, sems, *error_notification(target, msg))
+        except Exception as ne:
+            log(f"  - {tid}: error notification failed: {safe_text(ne)}")
+        log(f"  - {tid}: ERROR {msg}")
+        result["status"] = "timeout" if isinstance(e, DeadlineExceeded) else "error"
+        result["error"] = msg
+
+    finally:
+        LEASES.hold_until_commit(tid, lease)
+        result["elapsed"] = time.monotonic() - started
+
+    return result
+
+
+async def _delayed(delay: float, coro: Any) -> Any:
+    await asyncio.sleep(delay)
+    return await coro
+
+
+async def _run_once_async(cfg: Dict[str, Any], spread_sec: float = 0.0, store: Optional[TargetStore] = None) -> List[Dict[str, Any]]:
+    print(f"[{now_jst_str()}] run_once start (async)")
+
+    run_cfg = cfg.get("run", {}) or {}
+    async_cfg = cfg.get("async_engine", {}) or {}
+    timeout_sec = float(run_cfg.get("target_timeout_sec", 120))
+    sems = HostSemaphores(max(1, int(async_cfg.get("per_host", 4))))
+    targets = select_targets(cfg, store)
+
+    # requests is blocking: sockets are driven by a bounded executor, the loop does the scheduling
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=max(1, int(async_cfg.get("threads", 32))), thread_name_prefix="io")
+    loop.set_default_executor(executor)
+
+    SESSIONS.reap_idle()
+    started = time.monotonic()
+    try:
+        results = await asyncio.gather(*(
+            _delayed(phase_offset(t["id"], spread_sec), process_target_async(cfg, t, timeout_sec, sems)) for t in targets
+        ))
+    finally:
+        executor.shutdown(wait=False)
+        STATE.flush()  # one transaction for the whole run
+
+    if store is not None:
+        store.ran((r["id"] for r in results), time.time())
+    print_summary(list(results), time.monotonic() - started)
     print(f"[{now_jst_str()}] run_once end")
+    return list(results)
+
+
+def run_once_async(cfg: Dict[str, Any], spread_sec: float = 0.0, store: Optional[TargetStore] = None) -> List[Dict[str, Any]]:
+    # spread_sec > 0 starts each target at its phase_offset within that window
+    return asyncio.run(_run_once_async(cfg, spread_sec, store))
 
 
 def main() -> None:
@@ -342,20 +2868,66 @@ def main() -> None:
     parser.add_argument("--config", default="config.yaml")
     parser.add_argument("--once", action="store_true")
     parser.add_argument("--watch", action="store_true")
+    parser.add_argument("--engine", choices=["threads", "async"], default="threads")
     parser.add_argument("--interval", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None, help="max targets processed in parallel")
+    archive = parser.add_mutually_exclusive_group()
+    archive.add_argument("--record", metavar="DIR", help="save every HTTP response to DIR")
+    archive.add_argument("--replay", metavar="DIR", help="serve HTTP responses from DIR (offline; webhooks are not posted)")
+    parser.add_argument("--replay-latency", type=float, default=0.0, metavar="SCALE", help="sleep SCALE x the recorded response time (0: none)")
+    parser.add_argument("--shard-dir", metavar="DIR", help="share targets with the other workers heartbeating in DIR")
+    parser.add_argument("--worker-id", default=None, help="stable worker name for --shard-dir (default: host-pid with --watch, hostname otherwise; set it when several one-shot workers share a host)")
     args = parser.parse_args()
+    if args.replay and not os.path.isdir(args.replay):
+        parser.error(f"--replay: no such archive directory: {args.replay}")
 
     load_dotenv()
 
     cfg = load_yaml(args.config)
+    ws_cfg = cfg.get("websub", {}) or {}
+    if ws_cfg.get("enabled") and not str(ws_cfg.get("secret") or ""):
+        parser.error("websub.enabled requires websub.secret (pushes are verified with X-Hub-Signature)")
+    expand_targets(cfg, os.path.dirname(os.path.abspath(args.config)))
+    SESSIONS.configure(cfg.get("http", {}) or {})
+    RATE_LIMITS.configure((cfg.get("http", {}) or {}).get("rate_limits", {}) or {})
+    RETRY.configure((cfg.get("http", {}) or {}).get("retry", {}) or {})
+    DISK_CACHE.configure((cfg.get("http", {}) or {}).get("disk_cache", {}) or {})
+    BREAKER.configure((cfg.get("run", {}) or {}).get("breaker", {}) or {})
+    LEASES.configure((cfg.get("run", {}) or {}).get("lease", {}) or {})
+    ADAPTIVE.configure((cfg.get("watch", {}) or {}).get("adaptive", {}) or {})
+    jg_cfg = cfg.get("jgrants", {}) or {}
+    JGRANTS_CACHE.configure(jg_cfg.get("cache_ttl_sec", 240), jg_cfg.get("cache_max_entries", 256))
+    if args.record or args.replay:
+        HTTP_ARCHIVE.configure("record" if args.record else "replay", args.record or args.replay, args.replay_latency)
+    STATE.configure(cfg.get("state", {}) or {})
+    atexit.register(STATE.close)
+    if args.shard_dir:
+        # one-shot (cron) workers stay members between runs, so they need an id that the next
+        # run reuses; a host-pid id would leave a dead member owning a share of the targets
+        SHARDS.configure(cfg.get("shard", {}) or {}, args.shard_dir, args.worker_id or (None if args.watch else socket.gethostname()))
+        if args.watch:
+            atexit.register(SHARDS.leave)
+    if args.workers:
+        cfg.setdefault("run", {})["max_workers"] = args.workers
     interval = args.interval or int(cfg.get("watch", {}).get("interval_sec", 300))
 
-    if args.watch:
+    run = run_once_async if args.engine == "async" else run_once
+    store = TargetStore(cfg.get("targets", []) or [], interval) if (cfg.get("run", {}) or {}).get("skip_not_due") else None
+
+    if args.watch and args.engine == "threads":
+        websub = None
+        if (cfg.get("websub", {}) or {}).get("enabled"):
+            websub = WebSubReceiver(cfg)
+            websub.start()
+        Scheduler(cfg, interval, websub).run_forever()
+    elif args.watch:
+        spread = bool(cfg.get("watch", {}).get("spread", False))
         while True:
-            run_once(cfg)
-            time.sleep(interval)
+            started = time.monotonic()
+            run_once_async(cfg, spread_sec=interval if spread else 0.0, store=store)
+            time.sleep(max(0.0, interval - (time.monotonic() - started)) if spread else interval)
     else:
-        run_once(cfg)
+        run(cfg, store=store)
 
 
 if __name__ == "__main__":